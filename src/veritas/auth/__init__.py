@@ -3,12 +3,29 @@
 This module is used to store passwords in encrypted form in the profile.
 """
 import base64
+from functools import lru_cache
 from loguru import logger
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 
+@lru_cache(maxsize=128)
+def _derive_key(encryption_key:str, salt:str, iterations:int) -> bytes:
+    """derive the fernet key from encryption key and salt
+
+    PBKDF2 is slow by design. The key depends only on encryption_key, salt and
+    iterations, so it is derived once and shared by all tokens (eg. the password
+    and the ssh passphrase of a profile).
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=str.encode(salt),
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(str.encode(encryption_key)))
+
 def encrypt(password:str, encryption_key:str, salt:str, iterations:int=400000) -> str:
     """encrypt password
 
@@ -29,16 +46,7 @@ def encrypt(password:str, encryption_key:str, salt:str, iterations:int=400000) -
         base64 encoded and encrypted password
     """
     password_bytes = str.encode(password)
-    encrypt_pwd_bytes = str.encode(encryption_key)
-    salt_bytes = str.encode(salt)
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt_bytes,
-        iterations=iterations,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(encrypt_pwd_bytes))
-    f = Fernet(key)
+    f = Fernet(_derive_key(encryption_key, salt, iterations))
     token = f.encrypt(password_bytes)
     return base64.b64encode(token)
 
@@ -62,17 +70,7 @@ def decrypt(token:str, encryption_key:str, salt:str, iterations:int=400000) -> s
         clear password
     """
     token_bytes = base64.b64decode(token)
-    encryption_key_bytes = str.encode(encryption_key)
-    salt_bytes = str.encode(salt)
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt_bytes,
-        iterations=iterations,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(encryption_key_bytes))
-
-    f = Fernet(key)
+    f = Fernet(_derive_key(encryption_key, salt, iterations))
     try:
         return f.decrypt(token_bytes).decode("utf-8")
     except Exception as exc:
@@ -7,10 +7,10 @@ import csv
 import importlib
 import sys
 import pathlib
-from ipaddress import IPv4Network
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import IPv4Network, IPv4Address
 from loguru import logger
 from benedict import benedict
-from deepmerge import always_merger
 from pynautobot.models.ipam import IpAddresses
 
 # veritas
@@ -21,9 +21,83 @@ from veritas.onboarding.tags import get_tag_properties as _get_tag_properties
 from veritas.onboarding import plugins
 from veritas.tools import exceptions as veritas_exceptions
 
+# bound loggers used to trace where a device property comes from
+_log_dfl = logger.bind(extra='dfl')
+_log_inv_eq = logger.bind(extra='inv (=)')
+_log_inv_plus = logger.bind(extra='inv (+)')
+_log_onb_eq = logger.bind(extra='onb (=)')
+# netmask (eg. 255.255.255.0) to prefix length (eg. 24)
+_MASK_TO_PREFIX = {str(IPv4Address((0xFFFFFFFF << (32 - p)) & 0xFFFFFFFF)): p for p in range(33)}
+# properties that are converted to {subkey: value} by _extend_device_properties
+_SCALAR_TO_DICT = (('role', 'name'),
+                   ('manufacturer', 'name'),
+                   ('platform', 'name'),
+                   ('status', 'name'),
+                   ('device_type', 'model'))
+# inventory values (in any casing) that are converted to boolean values
+_BOOLEAN_VALUES = {'true': True, 'false': False}
+
+
+def _set_keypath(device, keypath, value):
+    """set value of keypath (eg. custom_fields.net) in the nested dicts of device"""
+    parts = keypath.split('.')
+    for part in parts[:-1]:
+        device = device.setdefault(part, {})
+    device[parts[-1]] = value
+
+
+def _coerce_row(row, device, column_mapping, value_mapping, value_mapping_none, keypaths=False):
+    """map the columns and values of an inventory row and write them to device
+
+    value_mapping_none contains the value of each mapped column that is used if
+    the value of the row is None. Compute it once per inventory, not per row.
+    If keypaths is True, a (mapped) column like custom_fields.net is written
+    to device['custom_fields']['net'] as the benedict rows of xlsx and csv
+    inventories did.
+    """
+    for k, v in row.items():
+        key = column_mapping.get(k, k)
+        if key in value_mapping:
+            if v is None:
+                value = value_mapping_none[key]
+            else:
+                value = value_mapping[key].get(v, v)
+        else:
+            value = v
+        # convert 'true' or 'false' (any casing) to boolean values; only
+        # strings of this length are lowered
+        if value.__class__ is str and 3 < len(value) < 6:
+            value = _BOOLEAN_VALUES.get(value.lower(), value)
+        if keypaths and key.__class__ is str and '.' in key:
+            _set_keypath(device, key, value)
+        else:
+            device[key] = value
+    return device
+
+
+def _merge_defaults(base, overlay):
+    """merge overlay into base (in place) and return base
+
+    Our defaults are at most two levels deep. Nested dicts are merged, all other
+    values of overlay override the values of base.
+    """
+    for key, value in overlay.items():
+        current = base.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            base[key] = {**current, **value}
+        else:
+            base[key] = value
+    return base
+
 
 class Onboarding():
 
+    # inventory reader (generator) by file extension
+    _INVENTORY_READERS = {'.csv': '_iter_csv_inventory',
+                          '.yaml': '_iter_yaml_inventory',
+                          '.yml': '_iter_yaml_inventory',
+                          '.xlsx': '_iter_xlsx_inventory'}
+
     def __init__(self, sot=None, onboarding_config=None, 
                  profile=None, tcp_port=22):
 
@@ -38,6 +112,26 @@ class Onboarding():
         self._device_facts = None
         self._device_defaults = None
         self._device_properties = None
+        # parsed mapping files; key is (filename, mtime)
+        self._mapping_cache = {}
+        # merged prefix defaults; key is the prefix path
+        self._prefix_defaults_cache = {}
+        self._prefix_defaults_source = None
+        self._prefix_tree = None
+
+        # config values that are used for each device
+        config = onboarding_config or {}
+        onboarding_cfg = config.get('onboarding', {})
+        self._csv_cfg = onboarding_cfg.get('inventory', {}).get('csv') or {}
+        self._interface_probe_order = tuple(onboarding_cfg.get('defaults', {}).get('interface', []))
+        self._export_dir = config.get('directories', {}).get('export', 'export')
+        conf_dir = config.get('git', {}).get('app_configs', {}).get('path')
+        if conf_dir:
+            self._mapping_filename = "%s/%s" % (
+                os.path.join(conf_dir, './onboarding/mappings/'),
+                onboarding_cfg.get('mappings', {}).get('inventory', {}).get('filename'))
+        else:
+            self._mapping_filename = None
 
         # load plugins
         logger.debug('importing standard onboarding_plugins')
@@ -57,8 +151,15 @@ class Onboarding():
         self._add_prefix = True
         self._assign_ip = True
         self._bulk = True
-        # open connection to nautobot
-        self._nautobot = self._sot.open_nautobot()
+        # the connection to nautobot is opened on first use
+        self._nautobot_api = None
+
+    @property
+    def _nautobot(self):
+        """return the nautobot api; the connection is opened on first access"""
+        if self._nautobot_api is None:
+            self._nautobot_api = self._sot.open_nautobot()
+        return self._nautobot_api
 
     # fluent interface
 
@@ -439,6 +540,8 @@ class Onboarding():
             # add interfces to nautobot
             v_response = self._add_interfaces_to_nautobot(device, virtual_interfaces, 'virtual')
             p_response = self._add_interfaces_to_nautobot(device, physical_interfaces, 'physical')
+            # interfaces of the device by name; read from nautobot when needed for the first time
+            nb_by_name = None
             # the interfaces were added; now add the IP addresses of ALL interfaces
             for interface in interfaces:
                 ip_addresses = interface.get('ip_addresses',[])
@@ -455,9 +558,10 @@ class Onboarding():
                     added_addresses = self._add_ipaddress_to_nautbot(device, ip_addresses)
                     if len(added_addresses) > 0:
                         # get interface object from nautobot
-                        nb_interface = self._nautobot.dcim.interfaces.get(
-                                    device_id=device.id,
-                                    name=interface.get('name'))
+                        if nb_by_name is None:
+                            nb_by_name = {nb.name: nb for nb in
+                                          self._nautobot.dcim.interfaces.filter(device_id=device.id)}
+                        nb_interface = nb_by_name.get(interface.get('name'))
                         for ip_address in added_addresses:
                             if self._assign_ip:
                                 if nb_interface:
@@ -505,11 +609,14 @@ class Onboarding():
             logger.error('either no device found or len(interfaces) == 0')
             return False
 
+        # get all interfaces of the device at once and look them up by name
+        nb_by_name = {nb.name: nb for nb in self._nautobot.dcim.interfaces.filter(device_id=device.id)}
+
         for interface in interfaces:
-            # get interface object from nautobot
-            nb_interface = self._nautobot.dcim.interfaces.get(
-                            device_id=device.id,
-                            name=interface.get('name'))
+            nb_interface = nb_by_name.get(interface.get('name'))
+            if not nb_interface:
+                logger.error(f'could not get interface {device.name}/{interface.get("name")}')
+                continue
             nb_interface.update(interface)
 
             # remove ALL assigments
@@ -596,6 +703,10 @@ class Onboarding():
             the exception is forwarded from pynautobot to the app
 
         """
+        # pynautobot serializes the properties to JSON; a plain dict is much cheaper
+        # to serialize than a benedict
+        if isinstance(device_properties, benedict):
+            device_properties = device_properties.dict()
         try:
             device_name = device_properties.get('name')
             logger.info(f'adding device {device_name} to SOT')
@@ -838,8 +949,7 @@ class Onboarding():
         platform = device_defaults.get('platform','ios')
         
         # we use a plugin to parse the config
-        plugin = plugins.Plugin()
-        configparser = plugin.get_configparser(platform)
+        configparser = plugins.get_configparser(platform)
         if not configparser:
             logger.critical(f'failed to load configparser for platform {platform}')
             raise veritas_exceptions.ConfigParserLoadError(
@@ -871,74 +981,84 @@ class Onboarding():
             return benedict(keyattr_dynamic=True)
 
         logger.debug(f'reading inventory {inventory}')
-        if 'csv' in inventory:
-            return self.read_csv_inventory(inventory)
-        elif 'yaml' in inventory or 'yml' in inventory:
-            return self.read_yaml_inventory(inventory)
-        elif 'xlsx' in inventory:
-            return self.read_xlsx_inventory(inventory)
-        else:
-            logger.ciritical(f'unknown file format {inventory}')
+        reader = self._get_inventory_reader(inventory)
+        if reader is None:
             return benedict(keyattr_dynamic=True)
+        return list(reader(inventory))
+
+    def iter_inventory(self, inventory):
+        """read inventory from file and return an iterator that yields one device after another"""
+
+        # check if file exists
+        if not os.path.exists(inventory):
+            logger.error('inventory does not exists or cannot be read')
+            return iter(())
+
+        logger.debug(f'reading inventory {inventory}')
+        reader = self._get_inventory_reader(inventory)
+        if reader is None:
+            return iter(())
+        return reader(inventory)
+
+    def _get_inventory_reader(self, inventory):
+        """return the generator that reads the inventory or None if the format is unknown"""
+        # use the file extension; a substring check would match directories like /yamlfiles/
+        reader = self._INVENTORY_READERS.get(os.path.splitext(inventory)[1].lower())
+        if reader is None:
+            logger.critical(f'unknown file format {inventory}')
+            return None
+        return getattr(self, reader)
 
     def read_mapping(self):
         """read mapping from miniapps config"""
-        conf_dir = self._onboarding_config.get('git').get('app_configs').get('path')
-        directory = os.path.join(conf_dir, './onboarding/mappings/')
-
-        filename = "%s/%s" % (directory, 
-            self._onboarding_config.get('onboarding',{}).get('mappings',{}).get('inventory',{}).get('filename')
-        )
-        if filename:
+        filename = self._mapping_filename
+        if filename is None:
+            logger.critical('no app_configs path configured; cannot read mapping')
+            raise Exception('no mapping configured')
+        # the mapping is cached until the file is modified
+        cache_key = (filename, os.stat(filename).st_mtime)
+        if cache_key not in self._mapping_cache:
             # read mapping from file
             logger.debug(f'reading mapping config {filename.rsplit("/")[-1]}')
             with open(filename) as f:
                 mapping_config = yaml.safe_load(f.read())
             column_mapping = mapping_config.get('mappings',{}).get('columns',{})
             value_mapping = mapping_config.get('mappings',{}).get('values',{})
+            self._mapping_cache[cache_key] = (column_mapping, value_mapping)
 
-        return column_mapping, value_mapping
+        return self._mapping_cache[cache_key]
 
     def read_xlsx_inventory(self, inventory):
         """read inventory from xlsx file and build list"""
+        return list(self._iter_xlsx_inventory(inventory))
 
-        devicelist = []
+    def read_csv_inventory(self, inventory):
+        """read inventory from csv file and build list"""
+        return list(self._iter_csv_inventory(inventory))
+
+    def read_yaml_inventory(self, inventory):
+        """read inventory from yaml file and build list"""
+        return list(self._iter_yaml_inventory(inventory))
+
+    def _iter_xlsx_inventory(self, inventory):
+        """read inventory from xlsx file and yield one device per row"""
 
         # get mapping
         column_mapping, value_mapping = self.read_mapping()
+        value_mapping_none = {k: v.get('None') for k, v in value_mapping.items()}
 
-        table = tools.read_excel_file(inventory)
-        for row in table:
-            device = benedict(keyattr_dynamic=True)
-            for k,v in row.items():
-                key = column_mapping.get(k) if k in column_mapping else k
-                if key in value_mapping:
-                    if v is None:
-                        value = value_mapping[key].get('None', v)
-                    else:
-                        value = value_mapping[key].get(v, v)
-                else:
-                    value = v
-                # convert 'true' or 'false' to boolean values
-                if isinstance(value, str) and value.lower() == 'true':
-                    value = True
-                if isinstance(value, str) and value.lower() == 'false':
-                    value = False
-                device[key] = value
-            devicelist.append(device)
-
-        return devicelist
-
-    def read_csv_inventory(self, inventory):
-        """read inventory from csv file and build list"""
+        for row in tools.iter_excel_file(inventory):
+            yield _coerce_row(row, {}, column_mapping, value_mapping, value_mapping_none, keypaths=True)
 
-        devicelist = []
+    def _iter_csv_inventory(self, inventory):
+        """read inventory from csv file and yield one device per row"""
 
         # get mapping
         column_mapping, value_mapping = self.read_mapping()
+        value_mapping_none = {k: v.get('None') for k, v in value_mapping.items()}
 
         # set default values
-        quote_config = self._onboarding_config.get('onboarding', {}).get('inventory', {}).get('csv')
+        quote_config = self._csv_cfg
         delimiter = quote_config.get('delimiter',',')
         quotechar = quote_config.get('quotechar','|')
         quoting_cf = quote_config.get('quoting','minimal')
@@ -956,56 +1076,21 @@ class Onboarding():
         with open(inventory, newline=newline) as csvfile:
             csvreader = csv.DictReader(csvfile, delimiter=delimiter, quoting=quoting, quotechar=quotechar)
             for row in csvreader:
-                device = benedict(keyattr_dynamic=True)
-                for k,v in row.items():
-                    key = column_mapping.get(k) if k in column_mapping else k
-                    if key in value_mapping:
-                        if v is None:
-                            value = value_mapping[key].get('None', v)
-                        else:
-                            value = value_mapping[key].get(v, v)
-                    else:
-                        value = v
-                    # convert 'true' or 'false' to boolean values
-                    if isinstance(value, str) and value.lower() == 'true':
-                        value = True
-                    if isinstance(value, str) and value.lower() == 'false':
-                        value = False
-                    device[key] = value
-                devicelist.append(device)
-
-        return devicelist
+                yield _coerce_row(row, {}, column_mapping, value_mapping, value_mapping_none, keypaths=True)
 
-    def read_yaml_inventory(self, inventory):
-        """read inventory from yaml file and build list"""
-        devicelist = []
+    def _iter_yaml_inventory(self, inventory):
+        """read inventory from yaml file and yield one device per entry"""
 
         # get mapping
         column_mapping, value_mapping = self.read_mapping()
+        value_mapping_none = {k: v.get('None') for k, v in value_mapping.items()}
 
+        # a yaml file can only be parsed as a whole
         with open(inventory) as f:
             table = yaml.safe_load(f.read())
 
         for row in table.get('inventory', []):
-            d = {}
-            for k,v in row.items():
-                key = column_mapping.get(k) if k in column_mapping else k
-                if key in value_mapping:
-                    if v is None:
-                        value = value_mapping[key].get('None', v)
-                    else:
-                        value = value_mapping[key].get(v, v)
-                else:
-                    value = v
-                # convert 'true' or 'false' to boolean values
-                if isinstance(value, str) and value.lower() == 'true':
-                    value = True
-                if isinstance(value, str) and value.lower() == 'false':
-                    value = False
-                d[key] = value
-            devicelist.append(d)
-
-        return devicelist
+            yield _coerce_row(row, {}, column_mapping, value_mapping, value_mapping_none)
 
     def get_device_defaults_from_prefix(self, all_defaults, ip):
         """
@@ -1027,13 +1112,27 @@ class Onboarding():
         192.168.0.1 / 192.168.0.0/16 / 0.0.0.0/0
         0.0.0.0 should always exist and set the default values.
         """
-        prefix_path = tools.get_prefix_path(all_defaults, ip)
+        # the tree and the merged defaults are valid as long as the defaults are the same
+        if all_defaults is not self._prefix_defaults_source:
+            self._prefix_defaults_cache = {}
+            self._prefix_tree = tools.get_prefix_tree(all_defaults)
+            self._prefix_defaults_source = all_defaults
+
+        prefix_path = tools.get_prefix_path(all_defaults, ip, tree=self._prefix_tree)
         logger.debug(f'the prefix path is {prefix_path}')
+
+        # many devices share the same prefix path; merge each path only once
+        cache_key = tuple(prefix_path)
+        merged = self._prefix_defaults_cache.get(cache_key)
+        if merged is None:
+            merged = {}
+            for prefix in prefix_path:
+                merged.update(all_defaults[prefix])
+            self._prefix_defaults_cache[cache_key] = merged
+
+        # the defaults are modified later; never return the cached dict itself
         defaults = benedict(keyattr_dynamic=True)
-        for prefix in prefix_path:
-            for key, value in all_defaults[prefix].items():
-                # logger.debug(f'key: {key} value: {value}')
-                defaults[key] = value
+        defaults.update(merged)
 
         return defaults
 
@@ -1057,27 +1156,24 @@ class Onboarding():
 
         # get default values from SOT / the lowest priority is the prefix default
         device_defaults = self.get_device_defaults_from_prefix(self._all_defaults, host_or_ip)
+        # loguru formats the message only if trace is enabled
         for key, value in device_defaults.items():
-            logger.bind(extra='dfl').trace(f'key={key} value={value}')
+            _log_dfl.trace('key={} value={}', key, value)
 
         saved_tags = device_defaults.get('tags')
 
-        # the second priority is the inventory
-        for key, value in dict(device_dict).items():
-            # do not overwrite values with None
-            if value is not None:
-                if key in device_defaults:
-                    logger.bind(extra='inv (=)').trace(f'key={key} value={value}')
-                else:
-                    logger.bind(extra='inv (+)').trace(f'key={key} value={value}')
+        # the second priority is the inventory; do not overwrite values with None
+        device_dict = {key: value for key, value in device_dict.items() if value is not None}
+        for key, value in device_dict.items():
+            if key in device_defaults:
+                _log_inv_eq.trace('key={} value={}', key, value)
             else:
-                del device_dict[key]
+                _log_inv_plus.trace('key={} value={}', key, value)
 
-        # we have to do a deep merge. We do not want to overwrite values
-        # always_merger: always try to merge. in the case of mismatches, the value 
-        # from the second object overrides the first one.
+        # we have to merge the nested dicts. We do not want to overwrite values
+        # in the case of mismatches, the value from the inventory overrides the default.
         # this merge is descructive!!!
-        result = always_merger.merge(device_defaults, device_dict)
+        result = _merge_defaults(device_defaults, device_dict)
 
         # tags is a list. We have to merge these two lists
         if saved_tags and 'tags' in device_dict:
@@ -1092,19 +1188,22 @@ class Onboarding():
         return self._device_defaults
 
     def read_config_and_facts_from_file(self, hostname):
-        device_config = ""
-        device_facts = {}
-
-        directory = self._onboarding_config.get('directories', {}).get('export','export')
+        directory = self._export_dir
 
-        config_filename = "./%s/%s.conf" % (directory, hostname.lower())
-        facts_filename = "./%s/%s.facts" % (directory, hostname.lower())
+        config_filename = pathlib.Path("./%s/%s.conf" % (directory, hostname.lower()))
+        facts_filename = pathlib.Path("./%s/%s.facts" % (directory, hostname.lower()))
         logger.debug(f'reading config from {config_filename} and facts from {facts_filename}')
 
-        with open(config_filename, 'r') as f:
-            device_config = f.read()
-        with open(facts_filename, 'r') as f:
-            device_facts = json.load(f)
+        # both files are read concurrently
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                config_future = executor.submit(config_filename.read_text)
+                facts_future = executor.submit(facts_filename.read_bytes)
+                device_config = config_future.result()
+                device_facts = json.loads(facts_future.result())
+        except FileNotFoundError as exc:
+            logger.error(f'could not read config and facts of {hostname}; {exc}')
+            return None, None
 
         return device_config, device_facts
 
@@ -1125,8 +1224,7 @@ class Onboarding():
         # but the user can register its own plugin to get the config
         #
         platform = device_defaults.get('platform')
-        plugin = plugins.Plugin()
-        get_caf = plugin.get_config_and_facts(platform)
+        get_caf = plugins.get_config_and_facts(platform)
         if not platform or not get_caf:
             logger.critical(f'failed to get config and facts for platform {platform}')
             raise Exception ('unknown platform')
@@ -1137,6 +1235,40 @@ class Onboarding():
             self._tcp_port, 
             scrapli_loglevel='none')
 
+    def get_devices_config_and_facts(self, devices, max_workers=None) -> list:
+        """get config and facts of many devices in parallel
+
+        The SSH connections are I/O bound, so the devices are queried using a thread pool.
+        The number of workers is either max_workers or onboarding.concurrency (default 10) of
+        our onboarding config.
+
+        Parameters
+        ----------
+        devices : list
+            list of (device_ip, device_defaults) tuples
+        max_workers : int, optional
+            number of parallel connections, by default None
+
+        Returns
+        -------
+        list
+            list of (device_config, device_facts) tuples in the same order as devices;
+            (None, None) if a device failed
+        """
+        if max_workers is None:
+            max_workers = self._onboarding_config.get('onboarding', {}).get('concurrency', 10)
+
+        def get_config_and_facts(device):
+            device_ip, device_defaults = device
+            try:
+                return self.get_device_config_and_facts(device_ip, device_defaults)
+            except Exception as exc:
+                logger.error(f'failed to get config and facts of {device_ip}; got exception {exc}')
+                return None, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(get_config_and_facts, devices))
+
     def get_default_values_from_repo(self):
         """get default values of prefixes"""
         name_of_repo = self._onboarding_config['git']['defaults']['repo']
@@ -1191,18 +1323,13 @@ class Onboarding():
         """return primary address of device depending on the configured 
            list of interfaces in our onboardign config"""
 
-        # get list of interfaces from config (the order is important; it is first match)
-        interfaces = self._onboarding_config.get('onboarding', {}) \
-                                            .get('defaults', {}) \
-                                            .get('interface', [])
-
-        # loop through device config and check if we find the interface
-        for iface in interfaces:
+        # the list of interfaces is taken from our config (the order is important; it is first match)
+        for iface in self._interface_probe_order:
             logger.debug(f'looking if {iface} is primary interface')
-            if self._configparser.get_interface_ipaddress(iface) is not None:
-                return self._configparser.get_interface_ipaddress(iface)
-            else:
-                logger.debug(f'no ip address on {iface} found')
+            address = self._configparser.get_interface_ipaddress(iface)
+            if address is not None:
+                return address
+            logger.debug(f'no ip address on {iface} found')
 
         return None
 
@@ -1251,7 +1378,10 @@ class Onboarding():
             primary_interface = interface.copy()
             primary_interface['name'] = interface_name
             # convert IP and MASK to cidr notation
-            prefixlen = IPv4Network("0.0.0.0/%s" % interface.get('mask')).prefixlen
+            mask = interface.get('mask')
+            prefixlen = _MASK_TO_PREFIX.get(mask)
+            if prefixlen is None:
+                prefixlen = IPv4Network("0.0.0.0/%s" % mask).prefixlen
             primary_interface['cidr'] = "%s/%s" % (interface.get('ip'), prefixlen)
             primary_interface['address'] = interface.get('ip')
             logger.debug(f'found primary interface; setting primary_address interface to {primary_address}')
@@ -1270,13 +1400,16 @@ class Onboarding():
             del primary_interface['ip']
         return primary_interface
 
-    def get_device_properties(self, use_default=True):
-        """get device properties"""
+    def get_device_properties(self, use_default=True, current_time=None):
+        """get device properties
+
+        current_time (eg. '2024-01-31 12:00:00') is used as last_modified; when onboarding
+        many devices compute it once and pass it to each call
+        """
 
         # we use our plugin architecture to use the right module
         platform = self._device_defaults.get('platform')
-        plugin = plugins.Plugin()
-        get_dp = plugin.get_device_properties(platform)
+        get_dp = plugins.get_device_properties(platform)
 
         if not get_dp:
             logger.critical(f'failed to get device properties for platform {platform}')
@@ -1284,7 +1417,10 @@ class Onboarding():
 
         device_properties = dict(self._device_defaults) if use_default else {}
         obj = get_dp(self._sot, self._device_facts, self._configparser, self._onboarding_config)
-        obj.get_device_properties(device_properties)
+        if current_time is None:
+            obj.get_device_properties(device_properties)
+        else:
+            obj.get_device_properties(device_properties, current_time=current_time)
         if not device_properties:
             return None
 
@@ -1299,7 +1435,7 @@ class Onboarding():
         if isinstance(tags, str):
             logger.debug('adding tag to device_properties')
             device_properties['tags'] = tags.split(',')
-            logger.bind(extra='onb (=)').trace(f'key=tags value={tags}')
+            _log_onb_eq.trace('key=tags value={}', tags)
 
         # save properties for later use
         self._device_properties = device_properties
@@ -1314,8 +1450,7 @@ class Onboarding():
 
         # we use our plugin architecture to use the right module
         platform = self._device_defaults.get('platform')
-        plugin = plugins.Plugin()
-        get_vp = plugin.get_vlan_properties(platform)
+        get_vp = plugins.get_vlan_properties(platform)
 
         if not get_vp:
             logger.critical(f'failed to get vlan properties for platform {platform}')
@@ -1328,8 +1463,7 @@ class Onboarding():
 
         # we use our plugin architecture to use the right module
         platform = self._device_defaults.get('platform')
-        plugin = plugins.Plugin()
-        get_ip = plugin.get_interface_properties(platform)
+        get_ip = plugins.get_interface_properties(platform)
 
         if not get_ip:
             logger.critical(f'failed to get interface properties for platform {platform}')
@@ -1357,16 +1491,16 @@ class Onboarding():
         interface_tags = {}
 
         if not device:
-            device = sot.get.device(name=hostname)
+            device = self._sot.get.device(name=hostname)
 
         for tag in tag_properties:
-            if tag.get('scope') == 'dcim.device':
+            scope = tag.get('scope')
+            if scope == 'dcim.device':
                 device_tags.append({'name': tag.get('name')})
-            if tag.get('scope') == 'dcim.interface':
-                interface_name = tag.get('interface')
-                if interface_name not in interface_tags:
-                    interface_tags[interface_name] = []
-                interface_tags[interface_name].append({'name': tag.get('name')})
+            elif scope == 'dcim.interface':
+                interface_tags.setdefault(tag.get('interface'), []).append({'name': tag.get('name')})
+
+        success = True
 
         # add device scope tags
         logger.debug(f'device_tags: {device_tags}')
@@ -1376,29 +1510,64 @@ class Onboarding():
                 device.update({'tags': device_tags})
             except Exception as exc:
                 logger.error(f'failed to add device tags {exc}')
+                success = False
 
         # add interface scope tags
         logger.debug(f'interface_tags: {interface_tags}')
         if len(interface_tags) > 0:
-            for interface_name in interface_tags:
-                iface = self._sot.get.interface(device_id=device.id, 
-                                                name=interface_name)
-                try:
-                    logger.info(f'adding tags {interface_tags[interface_name]} to {iface}')
-                    iface.update({'tags': interface_tags[interface_name]})
-                    return True
-                except Exception as exc:
-                    logger.error(f'failed to add interface tags {exc}')
-
-        return False
+            # get all interfaces in one call and update them using a single bulk request
+            interfaces = self._sot.get.interfaces(device_id=device.id, names=list(interface_tags))
+            updates = []
+            for iface in interfaces:
+                if iface.name in interface_tags:
+                    logger.info(f'adding tags {interface_tags[iface.name]} to {iface}')
+                    updates.append({'id': iface.id, 'tags': interface_tags[iface.name]})
+            if len(updates) < len(interface_tags):
+                logger.error('could not get all interfaces to add tags')
+                success = False
+            try:
+                if len(updates) > 0:
+                    self._nautobot.dcim.interfaces.update(updates)
+            except Exception as exc:
+                logger.error(f'failed to add interface tags {exc}')
+                success = False
+
+        return success
 
     def _extend_device_properties(self, properties):
         """ we have to modify some attributes like device_type and role
            but only if the value is not a dict"""
 
-        for item in ['role', 'manufacturer', 'platform', 'status']:
-            if item in properties and not isinstance(properties[item], dict):
-                properties[item] = {'name': properties[item]}
+        for key, subkey in _SCALAR_TO_DICT:
+            value = properties.get(key)
+            if value is not None and not isinstance(value, dict):
+                properties[key] = {subkey: value}
 
-        if 'device_type' in properties and not isinstance(properties['device_type'], dict):
-            properties['device_type'] = {'model': properties['device_type']}
+    def extend_device_properties_batch(self, list_of_properties:list) -> list:
+        """modify the attributes of many device properties at once
+
+        The same transformation as _extend_device_properties (and the tags conversion of
+        get_device_properties) but done column by column for a list of device properties.
+
+        Parameters
+        ----------
+        list_of_properties : list
+            list of device properties (dicts); the dicts are modified in place
+
+        Returns
+        -------
+        list
+            list_of_properties
+        """
+        for key, subkey in _SCALAR_TO_DICT:
+            for properties in list_of_properties:
+                value = properties.get(key)
+                if value is not None and not isinstance(value, dict):
+                    properties[key] = {subkey: value}
+
+        for properties in list_of_properties:
+            tags = properties.get('tags')
+            if isinstance(tags, str):
+                properties['tags'] = tags.split(',')
+
+        return list_of_properties
@@ -1,47 +1,71 @@
 from loguru import logger
+from concurrent.futures import ThreadPoolExecutor
 
 # veritas
 from veritas.devicemanagement import scrapli as dm
 from veritas.onboarding import plugins
 
 
-@plugins.config_and_facts('ios')
-def get_device_config_and_facts(device_ip, device_defaults, profile, tcp_port=22, scrapli_loglevel='none'):
+def _fetch_config_and_facts(ip, platform, manufacturer, username, password, 
+                            ssh_keyfile=None, port=22, scrapli_loglevel='none'):
+    """retrieve running-config and facts of a device
 
-    device_config = None
-    device_facts = {}
-    conn = dm.Devicemanagement(
-        ip=device_ip,
-        platform=device_defaults.get('platform','ios'),
-        manufacturer=device_defaults.get('manufacturer','cisco'),
-        username=profile.username,
-        password=profile.password,
-        ssh_keyfile=profile.ssh_keyfile,
-        port=tcp_port,
-        scrapli_loglevel=scrapli_loglevel)
+    A scrapli channel can only process one command at a time, so we use
+    two connections to retrieve the facts and the config concurrently.
 
-    # retrieve facts like fqdn, model and serialnumber
-    logger.debug('now gathering facts')
-    device_facts = conn.get_facts()
+    Returns
+    -------
+    config, facts : tuple
+        (None, None) if either of them could not be retrieved
+    """
 
-    if device_facts is None:
-        logger.error('got no facts; skipping device')
-        if conn:
-            conn.close()
-        return None, None
-    device_facts['args.device'] = device_ip
+    def connect():
+        return dm.Devicemanagement(
+            ip=ip,
+            platform=platform,
+            manufacturer=manufacturer,
+            username=username,
+            password=password,
+            ssh_keyfile=ssh_keyfile,
+            port=port,
+            scrapli_loglevel=scrapli_loglevel)
 
-    # retrieve device config
-    logger.debug("getting running-config")
+    facts_conn = connect()
+    config_conn = connect()
     try:
-        device_config = conn.get_config("running-config")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # retrieve facts like fqdn, model and serialnumber
+            logger.debug('now gathering facts and getting running-config')
+            facts_future = executor.submit(facts_conn.get_facts)
+            config_future = executor.submit(config_conn.get_config, "running-config")
+            device_facts = facts_future.result()
+            device_config = config_future.result()
     except Exception as exc:
-        logger.error(f'failed to receive device config from {device_ip}; got exception {exc}', exc_info=True)
+        logger.error(f'failed to receive config and facts from {ip}; got exception {exc}', exc_info=True)
+        return None, None
+    finally:
+        facts_conn.close()
+        config_conn.close()
+
+    if device_facts is None:
+        logger.error('got no facts; skipping device')
         return None, None
     if device_config is None:
-        logger.error(f'failed to retrieve device config from {device_ip}')
-        conn.close()
+        logger.error(f'failed to retrieve device config from {ip}')
         return None, None
-    conn.close()
+    device_facts['args.device'] = ip
 
     return device_config, device_facts
+
+
+@plugins.config_and_facts('ios')
+def get_device_config_and_facts(device_ip, device_defaults, profile, tcp_port=22, scrapli_loglevel='none'):
+    return _fetch_config_and_facts(
+        ip=device_ip,
+        platform=device_defaults.get('platform','ios'),
+        manufacturer=device_defaults.get('manufacturer','cisco'),
+        username=profile.username,
+        password=profile.password,
+        ssh_keyfile=profile.ssh_keyfile,
+        port=tcp_port,
+        scrapli_loglevel=scrapli_loglevel)
@@ -1,9 +1,8 @@
 import sys
+from functools import lru_cache
 from loguru import logger
 from datetime import datetime
 from slugify import slugify
-from deepmerge import always_merger
-from benedict import benedict
 
 # veritas
 from veritas.onboarding import plugins
@@ -11,6 +10,38 @@ from veritas.onboarding import additional
 from veritas.onboarding import abstract_device_properties as abc_device
 
 
+_slugify_cached = lru_cache(maxsize=4096)(slugify)
+# bound loggers used to trace where a device property comes from
+_log_gdp_plus = logger.bind(extra='gdp (+)')
+_log_gdp_eq = logger.bind(extra='gdp (=)')
+_log_add_eq = logger.bind(extra='add (=)')
+
+
+def _merge(base, extra):
+    """merge extra into base and return base
+
+    Our properties are flat or contain dicts like primary_interface or custom_fields.
+    Dicts are merged and lists are concatenated. All other values of extra override
+    the value of base. The nested dicts and lists of base are not modified because
+    they may be shared with the device defaults.
+    """
+    for key, value in extra.items():
+        current = base.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            base[key] = {**current, **value}
+        elif isinstance(current, list) and isinstance(value, list):
+            base[key] = current + value
+        else:
+            base[key] = value
+    return base
+
+def _slug(value):
+    """slugify value; the (few) different values of our devices are slugified only once"""
+    if value.__class__ is str:
+        return _slugify_cached(value)
+    return slugify(value)
+
+
 class DeviceProperties(abc_device.Device):
     def __init__(self, sot, device_facts, configparser, onboarding_config):
         logger.debug('initialiting DeviceProperties object')
@@ -19,7 +50,7 @@ class DeviceProperties(abc_device.Device):
         self._configparser = configparser
         self._onboarding_config = onboarding_config
 
-    def get_device_properties(self, device_properties):
+    def get_device_properties(self, device_properties, current_time=None):
         # if the device model was set in device_facts we use this value instead of the default value
         device_properties['device_type'] = self._device_facts.get('device_type', self._device_facts.get('model'))
 
@@ -31,25 +62,23 @@ class DeviceProperties(abc_device.Device):
                 sn = self._device_facts.get("serial_number")
         
             device_properties['serial'] = sn
-            logger.bind(extra='gdp (+)').trace(f'key=serial value={sn}')
+            _log_gdp_plus.trace('key=serial value={}', sn)
 
         # set custom fields; slugify value
-        cf_fields = benedict(keyattr_dynamic=True)
+        cf_fields = {}
         for key, value in device_properties.get('custom_fields',{}).items():
             if value is not None:
-                cf_fields[key.lower()] = slugify(value)
+                cf_fields[key.lower()] = _slug(value)
 
         # slugify device_type
         if 'device_type' in device_properties:
-            device_properties['device_type'] = slugify(device_properties['device_type'])
-            logger.bind(extra='gdp (=)').trace(
-                f'key=device_type value={device_properties["device_type"]}'
-            )
+            device_properties['device_type'] = _slug(device_properties['device_type'])
+            _log_gdp_eq.trace('key=device_type value={}', device_properties['device_type'])
 
-        # set current time
-        now = datetime.now()
-        current_time = now.strftime('%Y-%m-%d %H:%M:%S')
-        cf_fields.update({'last_modified': current_time})
+        # set current time; the caller can pass the same time for all devices
+        if current_time is None:
+            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        cf_fields['last_modified'] = current_time
 
         try:
             # add user defined additional values
@@ -59,19 +88,23 @@ class DeviceProperties(abc_device.Device):
                                                       self._configparser,
                                                       self._onboarding_config)
             # we have to merge all tags. So just save tags now and add new ones later
+            # copy the list; it may be shared with the device defaults
             saved_tags = device_properties.get('tags',[])
-            for key,value in dict(additional_values).items():
+            if isinstance(saved_tags, list):
+                saved_tags = list(saved_tags)
+            # we delete keys while looping; iterate over a snapshot of the items
+            for key,value in list(additional_values.items()):
                 if key.startswith('cf_'):
                     k = key.split('cf_')[1]
                     cf_fields[k] = value
                     del additional_values[key]
-                    logger.bind(extra='add (=)').trace(f'key={key} value={value}')
+                    _log_add_eq.trace('key={} value={}', key, value)
                 elif key == 'tags':
                     # do not overwrite tags. We build a list of tags
                     if isinstance(value, str):
                         saved_tags.append(value)
                     else:
-                        saved_tags = saved_tags + value
+                        saved_tags.extend(value)
                 elif key == 'primary_interface':
                     # check if we have to change the address
                     primary_address = additional_values.get('primary_interface',{}).get('address')
@@ -80,27 +113,26 @@ class DeviceProperties(abc_device.Device):
                         primary_interface_name = self._configparser.get_interface_name_by_address(primary_address)
                         new_primary_interface = self._configparser.get_interface(primary_interface_name)
                         logger.info(f'change primary_ip to {primary_address} and interface to {primary_interface_name}')
-                        logger.bind(extra='add (=)').\
-                            trace(f'key=primary_interface.address value={primary_address}')
+                        _log_add_eq.trace('key=primary_interface.address value={}', primary_address)
                         # if we found the new interface we use this value
                         # otherwise we use default values
                         if new_primary_interface:
                             additional_values['primary_interface.name'] = primary_interface_name
                             additional_values['primary_interface.description'] = new_primary_interface.get('description','')
                             additional_values['primary_interface.mask'] = new_primary_interface.get('mask','')
-                            logger.bind(extra='add (=)').\
-                                trace(f'key=primary_interface.name value={primary_interface_name}')
-                            logger.bind(extra='add (=)').\
-                                trace(f'key=primary_interface.description value={new_primary_interface.get("description","")}')
-                            logger.bind(extra='add (=)').\
-                                trace(f'key=primary_interface.mask value={new_primary_interface.get("mask","")}')
+                            _log_add_eq.trace('key=primary_interface.name value={}', primary_interface_name)
+                            _log_add_eq.trace('key=primary_interface.description value={}',
+                                              new_primary_interface.get('description',''))
+                            _log_add_eq.trace('key=primary_interface.mask value={}',
+                                              new_primary_interface.get('mask',''))
                 else:
                     if key in device_properties:
-                        logger.bind(extra='add (=)').trace(f'key={key} value={value}')
+                        _log_add_eq.trace('key={} value={}', key, value)
 
             # merge the device properties and the additional values
             # this merge is destructive!!!
-            result = always_merger.merge(device_properties, dict(additional_values))
+            # additional returns a benedict; merge its underlying dict (no copy needed)
+            result = _merge(device_properties, additional_values.dict())
             # restore tags!
             if len(saved_tags) > 0:
                 result['tags'] = saved_tags
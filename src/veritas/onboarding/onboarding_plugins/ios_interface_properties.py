@@ -1,4 +1,4 @@
-from ipaddress import IPv4Network
+from ipaddress import IPv4Network, IPv4Address
 from loguru import logger
 
 # veritas
@@ -6,99 +6,98 @@ from veritas.onboarding import plugins
 from veritas.onboarding import abstract_interface_properties as abc_interface
 
 
+# netmask (eg. 255.255.255.0) to prefix length (eg. 24)
+_MASK_TO_PREFIX = {str(IPv4Address((0xFFFFFFFF << (32 - p)) & 0xFFFFFFFF)): p for p in range(33)}
+# bound logger used to trace the interface properties
+_log_iface = logger.bind(extra='iface')
+
+
 class InterfaceProperties(abc_interface.Interface):
     def __init__(self, configparser):
         logger.debug('initialiting InterfaceProperties object')
         self._configparser = configparser
+        # name of port-channels (eg. Port-channel) used for lag members
+        self._pc_prefix = configparser.get_correct_naming("port-channel")
 
     def get_interface_properties(self, device_defaults):
         """return interface properties of ALL interfaces"""
         list_of_interfaces = []
-        for name in self._configparser.get_interfaces():
+        for name, interface in self._configparser.get_interfaces().items():
             logger.debug(f'geting property of interface {name}')
-            props = self.get_properties(device_defaults, name)
+            props = self.get_properties(device_defaults, name, interface)
 
             list_of_interfaces.append(props)
 
         return list_of_interfaces
 
-    def get_properties(self, device_defaults, name):
-        """return all properties of a single interface"""
+    def get_properties(self, device_defaults, name, interface=None):
+        """return all properties of a single interface
+
+        interface is the parsed config of the interface; if it is None the
+        config is looked up by name
+        """
 
         # get interface
-        interface = self._configparser.get_interfaces().get(name)
+        if interface is None:
+            interface = self._configparser.get_interfaces().get(name)
         # set location
         location = device_defaults['location']
 
-        # description must not be None
-        description = interface.get('description',"")
-        # set the basic properties of the device
+        if 'port-channel' in name.lower():
+            interface_type = 'lag'
+            _log_iface.trace('key=type value=lag')
+        else:
+            interface_type = interface.get('type','1000base-t')
+
+        # set the basic properties of the device; description must not be None
         interface_properties = {
                 'name': name,
-                'type': interface.get('type','1000base-t'),
+                'type': interface_type,
                 'enabled': 'shutdown' not in interface,
-                'description': description,
+                'description': interface.get('description',""),
                 'status': {'name': 'Active'}
         }
 
-        if 'port-channel' in name.lower():
-            interface_properties.update({'type': 'lag'})
-            logger.bind(extra='iface').trace('key=type value=lag')
-
         if 'ip' in interface:
             ip = interface.get("ip")
             # in case there is a / in our IP (this should not happen)
             if '/' in ip:
                 cidr = interface.get('ip')
             else:
-                ipv4 = IPv4Network(f'{interface.get("ip")}/{interface.get("mask")}', strict=False)
-                cidr = f'{interface.get("ip")}/{ipv4.prefixlen}'
-            interface_properties.update({"ip_addresses": [
-                                            {"address": cidr,
-                                             "status": {
-                                                "name": "Active"
-                                             }
-                                            }
-                                        ]})
+                prefixlen = _MASK_TO_PREFIX.get(interface.get("mask"))
+                if prefixlen is None:
+                    prefixlen = IPv4Network(f'{ip}/{interface.get("mask")}', strict=False).prefixlen
+                cidr = f'{ip}/{prefixlen}'
+            interface_properties["ip_addresses"] = [{"address": cidr,
+                                                     "status": {"name": "Active"}}]
 
         # check if interface is part of lag
         if 'channel_group' in interface:
-            pc = "%s%s" % (self._configparser.get_correct_naming("port-channel"), interface.get('channel_group'))
+            pc = f"{self._pc_prefix}{interface.get('channel_group')}"
             logger.debug(f'interface {name} is part of port-channel {pc}')
-            logger.bind(extra='iface').trace(f'key=lag.name value={pc}')
-            interface_properties.update({'lag': {'name': pc }})
+            _log_iface.trace('key=lag.name value={}', pc)
+            interface_properties['lag'] = {'name': pc}
 
         # setting switchport or trunk
         if 'mode' in interface:
             mode = interface.get('mode')
-            data = {}
             # process access switch ports
             if mode == 'access':
                 logger.debug(f'interface is access switchport {name}')
-                data = {"mode": "access",
-                        "untagged_vlan": {'vid': interface.get('vlan'),
-                                          'location': {'name': location}
-                                         }
-                    }
+                interface_properties['mode'] = 'access'
+                interface_properties['untagged_vlan'] = {'vid': interface.get('vlan'),
+                                                         'location': {'name': location}}
             # process trunks
             elif mode == 'trunk':
                 logger.debug(f'interface is a tagged switchport {name}')
                 # this port is either a trunk with allowed vlans (mode: tagged)
                 # or a trunk with all vlans mode: tagged-all
                 if 'vlans_allowed' in interface:
-                    vlans = []
-                    for vlan in interface.get('vlans_allowed'):
-                        vlans.append({'vid': vlan,
-                                      'location': {'name': location}
-                                     })
-                    data = {'mode': 'tagged', 
-                            'tagged_vlans': vlans}
+                    interface_properties['mode'] = 'tagged'
+                    interface_properties['tagged_vlans'] = [{'vid': vlan, 'location': {'name': location}}
+                                                            for vlan in interface.get('vlans_allowed')]
                 else:
-                    data = {'mode': "tagged-all"}
-
-            if len(data) > 0:
-                logger.debug(f'updating interface {name}')
-                interface_properties.update(data)
+                    interface_properties['mode'] = 'tagged-all'
 
         return interface_properties
 
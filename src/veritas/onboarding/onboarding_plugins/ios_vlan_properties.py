@@ -1,4 +1,5 @@
 
+from itertools import chain
 from loguru import logger
 
 # veritas
@@ -8,43 +9,19 @@ from veritas.onboarding import plugins
 def get_vlan_properties(ciscoconf, device_defaults):
     global_vlans, svi, trunk_vlans = ciscoconf.get_vlans()
     list_of_vlans = []
-    all_vlans = {}
+    # all vlans of a device are in the same location; the vid is unique
+    seen = set()
     location = device_defaults['location']
 
-    for vlan in global_vlans:
+    for vlan in chain(global_vlans, svi, trunk_vlans):
         vid = vlan.get('vid')
-        name = vlan.get('name','')
-        if '-' in vid or ',' in vid:
+        # skip ranges (1-10), lists (1,2,3) and any other vid that is not a number
+        if not vid.isdigit() or vid in seen:
             continue
-        if f'{vid}__{location}' not in all_vlans:
-            all_vlans[f'{vid}__{location}'] = True
-            list_of_vlans.append({'name': name,
-                                  'vid': vid,
-                                  'status': {'name': 'Active'},
-                                  'location': location})
-
-    for vlan in svi:
-        vid = vlan.get('vid')
-        name = vlan.get('name','')
-        if '-' in vid or ',' in vid:
-            continue
-        if f'{vid}__{location}' not in all_vlans:
-            all_vlans[f'{vid}__{location}'] = True
-            list_of_vlans.append({'name': name,
-                                  'vid': vid,
-                                  'status': {'name': 'Active'},
-                                  'location': device_defaults['location']})
-
-    for vlan in trunk_vlans:
-        vid = vlan.get('vid')
-        name = vlan.get('name','')
-        if '-' in vid or ',' in vid:
-            continue
-        if f'{vid}__{location}' not in all_vlans:
-            all_vlans[f'{vid}__{location}'] = True
-            list_of_vlans.append({'name': name,
-                                  'vid': vid,
-                                  'status': {'name': 'Active'},
-                                  'location': device_defaults['location']})
+        seen.add(vid)
+        list_of_vlans.append({'name': vlan.get('name',''),
+                              'vid': vid,
+                              'status': {'name': 'Active'},
+                              'location': location})
 
     return list_of_vlans
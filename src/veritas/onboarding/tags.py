@@ -1,3 +1,4 @@
+import io
 import re
 import yaml
 import os
@@ -5,17 +6,20 @@ import glob
 from loguru import logger
 
 
-def get_tag_properties(device_fqdn, device_properties, device_facts, configparser, onboarding_config):
+# compiled patterns of our tag configs; key is the pattern
+_PATTERN_CACHE = {}
+# parsed tag configs; key is the filename, value is (mtime, config)
+_YAML_CACHE = {}
+# tag config files of a directory; key is the directory, value is (mtime, filenames)
+_TAG_FILES = {}
+# lines that start a new interface section
+_INTERFACE_PREFIXES = ('interface ', 'Interface ', 'INTERFACE ')
 
-    tags = []
 
-    default_tags = from_default(device_properties)
-    file_tags = from_file(device_fqdn, device_properties, device_facts, configparser, onboarding_config)
+def get_tag_properties(device_fqdn, device_properties, device_facts, configparser, onboarding_config):
 
-    for tag in default_tags:
-        tags.append(tag)
-    for tag in file_tags:
-        tags.append(tag)
+    tags = from_default(device_properties)
+    tags.extend(from_file(device_fqdn, device_properties, device_facts, configparser, onboarding_config))
 
     return tags
 
@@ -40,7 +44,7 @@ def from_file(device_fqdn, device_properties, device_facts, configparser, onboar
     directory = os.path.join(basedir, './onboarding/tags/')
 
     # we read all *.yaml files in our tags config dir
-    for filename in glob.glob(os.path.join(directory, "*.yaml")):
+    for filename in _get_tag_files(directory):
         logger.debug(f'reading {filename.rsplit("/")[-1]}')
         config = read_file(filename, device_properties)
         if config is None:
@@ -49,83 +53,131 @@ def from_file(device_fqdn, device_properties, device_facts, configparser, onboar
         # get the source. It is either a section or a (named) regular expression
         if 'section' in config['source']:
             device_config = configparser.get_section(config['source']['section'])
-            response += parse_config(device_config, device_fqdn, config)
+            response.extend(parse_config(device_config, device_fqdn, config))
         elif 'fullconfig' in config['source']:
-            device_config = configparser.get_device_config().splitlines()
-            response += parse_config(device_config, device_fqdn, config)
+            # parse_config walks the lines only once; do not build a list of all lines
+            device_config = (line.rstrip('\r\n') for line in io.StringIO(configparser.get_device_config()))
+            response.extend(parse_config(device_config, device_fqdn, config))
         elif 'device' in config['source']:
-            response += parse_device_properties(device_fqdn,
-                                                device_facts,
-                                                config['source']['device'],
-                                                config)
+            response.extend(parse_device_properties(device_fqdn,
+                                                    device_facts,
+                                                    config['source']['device'],
+                                                    config))
         else:
             logger.error("unknown source %s" % config['source'])
 
     return response
 
+def _get_tag_files(directory):
+    """return all *.yaml files of directory
+
+    The list is cached until a file is added to or removed from the directory.
+    Modified files are detected by read_file.
+    """
+    mtime = os.path.getmtime(directory)
+    cached = _TAG_FILES.get(directory)
+    if cached is None or cached[0] != mtime:
+        cached = _TAG_FILES[directory] = (mtime, sorted(glob.glob(os.path.join(directory, "*.yaml"))))
+    return cached[1]
+
 def read_file(filename, device_properties):
-    with open(filename) as f:
-        config = {}
-        logger.debug(f'opening {filename.rsplit("/")[-1]} to read custom field config')
-        try:
-            config = yaml.safe_load(f.read())
-            if config is None:
-                logger.error(f'could not parse {filename}')
+    # the tag config is read only once unless the file is modified
+    mtime = os.path.getmtime(filename)
+    cached = _YAML_CACHE.get(filename)
+    if cached is not None and cached[0] == mtime:
+        config = cached[1]
+    else:
+        with open(filename) as f:
+            logger.debug(f'opening {filename.rsplit("/")[-1]} to read custom field config')
+            try:
+                config = yaml.safe_load(f.read())
+            except Exception as exc:
+                logger.error(f'could not read {filename}; got exception {exc}')
                 return None
-        except Exception as exc:
-            logger.error(f'could not read {filename}; got exception {exc}')
-            return None
-
-        name = config.get('name')
-        platform = config.get('platform')
-        if not config.get('active'):
-            logger.debug(f'tags {name} in {filename.rsplit("/")[-1]} is not active')
+        # replaces the config of an older mtime
+        _YAML_CACHE[filename] = (mtime, config)
+    if config is None:
+        logger.error(f'could not parse {filename}')
+        return None
+
+    name = config.get('name')
+    platform = config.get('platform')
+    if not config.get('active'):
+        logger.debug(f'tags {name} in {filename.rsplit("/")[-1]} is not active')
+        return None
+    if platform is not None:
+        device_platform = device_properties.get('platform',{}).get('name','')
+        if platform != 'all' and platform != device_platform:
+            logger.debug(f'skipping custom field {name} wrong platform {platform}')
             return None
-        if platform is not None:
-            device_platform = device_properties.get('platform',{}).get('name','')
-            if platform != 'all' and platform != device_platform:
-                logger.debug(f'skipping custom field {name} wrong platform {platform}')
-                return None
-        return config
+    return config
 
 def parse_device_properties(device_fqdn, device_facts, host_or_ip, config):
     logger.debug('looking for tags depending on hostname or ip')
 
-    list_of_items = []
-    list_of_ip = []
-    list_of_hostnames = []
-    list_of_models = []
-    list_of_manufacturers = []
-    list_of_os_version = []
     response = []
 
     if isinstance(host_or_ip, dict):
-        list_of_items.append(host_or_ip)
+        list_of_items = [host_or_ip]
     else:
         list_of_items = host_or_ip
 
-    for item in list_of_items:
-        if 'ip' in item:
-            list_of_ip.append(item['ip'])
-        if 'hostname' in item:
-            list_of_hostnames.append(item['hostname'])
-        if 'model' in item:
-            list_of_models.append(item['model'])
-        if 'manufacturer' in item:
-            list_of_manufacturers.append(item['manufacturer'])
-        if 'os_version' in item:
-            list_of_os_version.append(item['os_version'])
-
-    if device_fqdn in list_of_hostnames or device_facts['args.device'] in list_of_ip or \
-       device_facts['model'] in list_of_models or device_facts['manufacturer'] in list_of_manufacturers or \
-       device_facts['os_version'] in list_of_os_version:
-        if 'tags' in config:
-            for tag in config['tags']:
-                response.append({'name': tag['name'], 'scope': 'dcim.device'})
+    # the device matches if any item has the same hostname, ip, model, manufacturer or os_version
+    device_values = (('hostname', device_fqdn),
+                     ('ip', device_facts.get('args.device')),
+                     ('model', device_facts.get('model')),
+                     ('manufacturer', device_facts.get('manufacturer')),
+                     ('os_version', device_facts.get('os_version')))
+    matched = any(key in item and item[key] == value
+                  for item in list_of_items
+                  for key, value in device_values)
+
+    if matched and 'tags' in config:
+        for tag in config['tags']:
+            response.append({'name': tag['name'], 'scope': 'dcim.device'})
     return response
 
+def _compile(pattern):
+    """return compiled pattern; the patterns are compiled only once"""
+    compiled = _PATTERN_CACHE.get(pattern)
+    if compiled is None:
+        compiled = _PATTERN_CACHE[pattern] = re.compile(pattern)
+    return compiled
+
+def _compile_prefilter(patterns):
+    """return one pattern that matches if any of the patterns matches
+
+    The combined pattern is used to skip lines that match none of our patterns.
+    Returns None if the patterns cannot be combined. Patterns with groups are
+    never combined: the alternation renumbers the groups and a numbered
+    backreference (eg. \\1) would refer to a group of another pattern.
+    """
+    if len(patterns) < 2:
+        return None
+    if any(_compile(pattern).groups for pattern in patterns):
+        return None
+    combined = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    try:
+        return _compile(combined)
+    except re.error:
+        logger.debug('could not combine tag patterns; checking each pattern')
+        return None
+
+def _compile_contains_filter(strings):
+    """return one pattern that finds any of the strings in a line
+
+    The strings are escaped so the regex engine scans each line only once
+    instead of once per string. Returns None if there are less than two strings.
+    """
+    if len(strings) < 2:
+        return None
+    return _compile('|'.join(re.escape(string) for string in strings))
+
 def parse_config(device_config, device_fqdn, config):
-    response = []
+    # each rule is (match method of the pattern, contains, scope, name, list of found tags)
+    rules = []
+    patterns = []
+    strings = []
     for tags in config.get('tags',[]):
         pattern = tags.get('pattern', None)
         contains = tags.get('contains', None)
@@ -133,32 +185,48 @@ def parse_config(device_config, device_fqdn, config):
         name_of_tag = tags.get('name')
         if pattern:
             logger.debug(f'name: {name_of_tag} scope: {scope_of_tag} pattern: {pattern}')
-            compiled = re.compile(pattern)
+            rules.append((_compile(pattern).match, None, scope_of_tag, name_of_tag, []))
+            patterns.append(pattern)
         elif contains:
             logger.debug(f'name: {name_of_tag} scope: {scope_of_tag} string: {contains}')
-        interface = None
-        for line in device_config:
-            # check if we have an interface that is needed with scope dcim.interface
-            if line.lower().startswith('interface '):
-                interface = line[10:]
-            if pattern:
-                match = compiled.match(line)
-                if match:
-                    logger.debug(f'pattern found on interface {interface}')
-                    if scope_of_tag == "dcim.interface" and interface is not None:
-                       response.append({'name': name_of_tag,
-                                        'interface': interface,
-                                        'scope': scope_of_tag})
-                    elif scope_of_tag == "dcim.device":
-                        response.append({'name': name_of_tag,
-                                     'scope': scope_of_tag})
-            elif contains and contains in line:
-                logger.debug(f'string found on interface {interface}')
-                if scope_of_tag == "dcim.interface" and interface is not None:
-                    response.append({'name': name_of_tag,
-                                     'interface': interface,
-                                     'scope': scope_of_tag})
-                elif scope_of_tag == "dcim.device":
-                    response.append({'name': name_of_tag,
-                                     'scope': scope_of_tag})
+            rules.append((None, contains, scope_of_tag, name_of_tag, []))
+            strings.append(contains)
+    prefilter = _compile_prefilter(patterns)
+    contains_filter = _compile_contains_filter(strings)
+    # this loop runs for each line of the config; look up the methods only once
+    prefilter_match = prefilter.match if prefilter is not None else None
+    contains_search = contains_filter.search if contains_filter is not None else None
+    debug = logger.debug
+
+    # we walk through the config only once and check all rules on each line
+    interface = None
+    for line in device_config:
+        # check if we have an interface that is needed with scope dcim.interface
+        if line.startswith(_INTERFACE_PREFIXES):
+            interface = line[10:]
+        any_pattern = prefilter_match is None or prefilter_match(line) is not None
+        any_string = contains_search is None or contains_search(line) is not None
+        if not any_pattern and not any_string:
+            continue
+        for match, contains, scope_of_tag, name_of_tag, found in rules:
+            if match is not None:
+                if not any_pattern or not match(line):
+                    continue
+                debug('pattern found on interface {}', interface)
+            elif any_string and contains in line:
+                debug('string found on interface {}', interface)
+            else:
+                continue
+            if scope_of_tag == "dcim.interface" and interface is not None:
+                found.append({'name': name_of_tag,
+                              'interface': interface,
+                              'scope': scope_of_tag})
+            elif scope_of_tag == "dcim.device":
+                found.append({'name': name_of_tag,
+                              'scope': scope_of_tag})
+
+    # the tags are returned in the order of our rules
+    response = []
+    for rule in rules:
+        response.extend(rule[4])
     return response
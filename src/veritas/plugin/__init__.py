@@ -1,25 +1,40 @@
 from loguru import logger
 
 
+# the registry of plugins; the key is the name of the app
+_registry = {'kobold': {},
+             'jobschleuder': {},
+             'configmanagement': {},
+             'plugins': {}}
+
+
+def _add(app:str, name:str, method:callable) -> None:
+    """register a plugin
+
+    Parameters
+    ----------
+    app : str
+        name of the app
+    name : str
+        name of the plugin
+    method : callable
+        the method to be registered
+    """
+    logger.debug('added {}/{} to registry', app, name)
+    _registry[app][name] = method
+
+
 class Plugin(object):
-    """This class is a singleton that holds the registry of plugins.
+    """This class gives access to the registry of plugins.
+
+    The registry is a module-level dict. All Plugin objects share it.
 
     Returns
     -------
     Plugin
         The plugin object
     """
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            logger.debug('Creating plugin object')
-            cls._instance = super(Plugin, cls).__new__(cls)
-            cls._registry = {'kobold': {},
-                             'jobschleuder': {},
-                             'configmanagement': {},
-                             'plugins': {}}
-        return cls._instance
+    _registry = _registry
 
     def get(self, app:str, name:str) -> callable:
         """return registry entry
@@ -112,8 +127,7 @@ class Plugin(object):
         method : callable
             the method to be registered
         """
-        logger.debug(f'added {app}/{name} to registry')
-        self._registry[app][name] = method
+        _add(app, name, method)
 
 def kobold(name:str):
     """decorator to register a kobold plugin
@@ -124,9 +138,8 @@ def kobold(name:str):
         name to be registered
     """    
     def decorator(func):
-        plugin = Plugin()
-        logger.debug(f'registering {name} / {func}')
-        plugin.add('kobold', name, func)
+        logger.debug('registering {} / {}', name, func)
+        _add('kobold', name, func)
         # return fn unmodified
         return func
     return decorator
@@ -140,9 +153,8 @@ def jobschleuder(name:str):
         name to be registered
     """    
     def decorator(func):
-        plugin = Plugin()
-        logger.debug(f'registering {name} / {func}')
-        plugin.add('jobschleuder', name, func)
+        logger.debug('registering {} / {}', name, func)
+        _add('jobschleuder', name, func)
         # return fn unmodified
         return func
     return decorator
@@ -156,9 +168,8 @@ def configmanagement(name:str):
         name to be registered
     """    
     def decorator(func):
-        plugin = Plugin()
-        logger.debug(f'registering {name} / {func}')
-        plugin.add('configmanagement', name, func)
+        logger.debug('registering {} / {}', name, func)
+        _add('configmanagement', name, func)
         # return fn unmodified
         return func
     return decorator
@@ -172,9 +183,8 @@ def register(name:str):
         name to be registered
     """    
     def decorator(func):
-        plugin = Plugin()
-        logger.debug(f'registering {name} / {func}')
-        plugin.add('plugins', name, func)
+        logger.debug('registering {} / {}', name, func)
+        _add('plugins', name, func)
         # return fn unmodified
         return func
     return decorator
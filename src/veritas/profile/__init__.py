@@ -8,6 +8,11 @@ import veritas.auth
 __version__ = version("veritas")
 
 
+def _crypto_env() -> tuple:
+    """return encryption key, salt and iterations of our environment"""
+    return os.getenv('ENCRYPTIONKEY'), os.getenv('SALT'), int(os.getenv('ITERATIONS'))
+
+
 class Profile(object):
     """This class reads the profile configuration and sets the username, password, ssh_key and ssh_passphrase.
 
@@ -31,41 +36,51 @@ class Profile(object):
         username=None, password=None, 
         ssh_key=None, ssh_passphrase=None):
         self._username = None
+        # the tokens are decrypted when password or ssh_passphrase is accessed
+        self._username_token = None
+        self._ssh_token = None
         self._password = None
+        self._ssh_passphrase = None
+        self._password_decrypted = False
+        self._ssh_passphrase_decrypted = False
+        # encryption key, salt and iterations; read when the first token is decrypted
+        self._crypto = None
+
+        # the config of our profile (if any)
+        profile = (profile_config or {}).get('profiles', {}).get(profile_name) or {}
 
         if profile_name is not None:
-            self._username = profile_config.get('profiles',{}).get(profile_name,{}).get('username')
-            username_token = profile_config.get('profiles',{}).get(profile_name,{}).get('password')
-            ssh_token = profile_config.get('profiles',{}).get(profile_name,{}).get('ssh_key_passphrase')
+            self._username = profile.get('username')
+            username_token = profile.get('password')
+            ssh_token = profile.get('ssh_key_passphrase')
 
-            # decrypt user password
             if self._username and username_token:
-                logger.bind(extra="profile").debug('decrypting username and token')
-                self._password = veritas.auth.decrypt(
-                    token=username_token,
-                    encryption_key=os.getenv('ENCRYPTIONKEY'), 
-                    salt=os.getenv('SALT'), 
-                    iterations=int(os.getenv('ITERATIONS')))
-            else:
-                self._password = None
-
-            # decrypt ssh_passphrase
+                self._username_token = username_token
             if ssh_token and ssh_token.lower() != 'none':
-                logger.bind(extra="profile").debug('decrypting ssh_token')
-                self._ssh_passphrase = veritas.auth.decrypt(
-                    token=ssh_token,
-                    encryption_key=os.getenv('ENCRYPTIONKEY'), 
-                    salt=os.getenv('SALT'), 
-                    iterations=int(os.getenv('ITERATIONS')))
-            else:
-                self._ssh_passphrase = None
+                self._ssh_token = ssh_token
 
         # overwrite username and password if configured by user
         self._username = username if username else self._username
-        self._password = password if password else self._password
-        self._ssh_key = ssh_key if ssh_key else profile_config.get('profiles',{}).get(profile_name,{}).get('ssh_key')
+        if password:
+            self._password = password
+            self._password_decrypted = True
+        if ssh_passphrase:
+            self._ssh_passphrase = ssh_passphrase
+            self._ssh_passphrase_decrypted = True
+        self._ssh_key = ssh_key if ssh_key else profile.get('ssh_key')
 
         logger.bind(extra="profile").info(f'profile added username={self._username} password=xxx ssh_key={self._ssh_key}')
+
+    def _decrypt(self, token:str) -> str:
+        """decrypt token using the key, salt and iterations of our environment"""
+        if self._crypto is None:
+            self._crypto = _crypto_env()
+        encryption_key, salt, iterations = self._crypto
+        return veritas.auth.decrypt(
+            token=token,
+            encryption_key=encryption_key, 
+            salt=salt, 
+            iterations=iterations)
     
     @property
     def username(self) -> str:
@@ -87,6 +102,11 @@ class Profile(object):
         password : str
             the password
         """       
+        if not self._password_decrypted:
+            if self._username_token:
+                logger.bind(extra="profile").debug('decrypting username and token')
+                self._password = self._decrypt(self._username_token)
+            self._password_decrypted = True
         return self._password
     
     @property
@@ -120,4 +140,9 @@ class Profile(object):
         ssh_passphrase : str
             the ssh_passphrase
         """         
+        if not self._ssh_passphrase_decrypted:
+            if self._ssh_token:
+                logger.bind(extra="profile").debug('decrypting ssh_token')
+                self._ssh_passphrase = self._decrypt(self._ssh_token)
+            self._ssh_passphrase_decrypted = True
         return self._ssh_passphrase
@@ -1,8 +1,10 @@
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
 from pathlib import Path
 from pydriller import Repository as pyRepository
 from git import Repo
+from git.exc import GitCommandError
 
 #
 # todo
@@ -10,6 +12,89 @@ from git import Repo
 # git log -p -- path/to/file
 # git diff HEAD^^
 
+# errors raised by pydriller/git when the files of a commit cannot be read
+_COMMIT_ERRORS = (AttributeError, ValueError, GitCommandError)
+_log_repo = logger.bind(extra='repo')
+
+# fields (and git log placeholders) of iter_commits_summary; separated by the
+# ASCII unit separator, each commit is terminated by NUL (git log -z)
+_LOG_FIELDS = (('hash', '%H'),
+               ('author_name', '%an'),
+               ('author_email', '%ae'),
+               ('author_date', '%aI'),
+               ('committer_name', '%cn'),
+               ('committer_email', '%ce'),
+               ('committer_date', '%cI'),
+               ('parents', '%P'),
+               ('message', '%B'))
+_LOG_KEYS = tuple(key for key, _ in _LOG_FIELDS)
+_LOG_FORMAT = '%x1f'.join(placeholder for _, placeholder in _LOG_FIELDS)
+
+
+def _file_records(commit, diff:bool, diff_parsed:bool, source:bool, source_before:bool):
+    """yield one record per modified file of a (pydriller) commit"""
+    _join = ', '.join
+    # the values of the commit are the same for each file
+    base_record = {
+        'hash': commit.hash,
+        'message': commit.msg,
+        'author_name': commit.author.name,
+        'author_email': commit.author.email,
+        'author_date': str(commit.author_date),
+        'author_tz': commit.author_timezone,
+        'committer_name': commit.committer.name,
+        'committer_email': commit.committer.email,
+        'committer_date': str(commit.committer_date),
+        'committer_tz': commit.committer_timezone,
+        'in_main': commit.in_main_branch,
+        'is_merge': commit.merge,
+        'num_deletes': commit.deletions,
+        'num_inserts': commit.insertions,
+        'net_lines': commit.insertions - commit.deletions,
+        'num_files': commit.files,
+        'branches': _join(commit.branches),
+    }
+    project_name = commit.project_name
+    project_path = commit.project_path
+    parents = _join(commit.parents)
+    for f in commit.modified_files:
+        record = base_record.copy()
+        record['filename'] = f.filename
+        record['old_path'] = f.old_path
+        record['new_path'] = f.new_path
+        record['nloc'] = f.nloc
+        record['added_lines'] = f.added_lines
+        record['deleted_lines'] = f.deleted_lines
+        record['project_name'] = project_name
+        record['project_path'] = project_path
+        record['parents'] = parents
+        if diff:
+            record['diff'] = f.diff
+        if diff_parsed:
+            record['diff_parsed'] = f.diff_parsed
+        if source:
+            record['source_code'] = f.source_code
+        if source_before:
+            record['source_code_before'] = f.source_code_before
+        yield record
+
+
+def _extract_commit(args:tuple) -> list:
+    """return the records of a single commit
+
+    This function runs in a worker process. It opens its own repository so that
+    no pydriller state has to be pickled.
+    """
+    path, hash, diff, diff_parsed, source, source_before = args
+    records = []
+    for commit in pyRepository(path, single=hash).traverse_commits():
+        try:
+            records.extend(_file_records(commit, diff, diff_parsed, source, source_before))
+        except _COMMIT_ERRORS:
+            _log_repo.warning('Problem reading commit {}', hash)
+    return records
+
+
 class Repository:
     """This class is a wrapper around the gitpython library. It provides a simple interface to interact with a git repository.
 
@@ -25,8 +110,13 @@ class Repository:
 
     def __init__(self, path: str, repo: str, ssh_cmd=None):
             self.path = Path(path).expanduser().resolve()
+            # git and pydriller expect a str; convert the path only once
+            self._path_str = str(self.path)
             self._repo_name = repo
             self._ssh_cmd = ssh_cmd
+            # git config and info; reset by the methods that modify them
+            self._config_cache = None
+            self._info_cache = None
             # Initialize repository
             logger.bind(extra="repo").debug(f'opening REPO {repo} path={self.path} ssh={self._ssh_cmd}')
             self._open_repository()
@@ -42,14 +132,22 @@ class Repository:
         Returns
         -------
         item
-            the attribute
+            the attribute of the underlying git repository (eg. remotes)
+
+        Raises
+        ------
+        AttributeError
+            if neither this object nor the git repository has the attribute
         """
-        if item == 'remotes':
-            return self._repo.remotes
+        # use __dict__; self._repo would call __getattr__ again if the repo is not opened yet
+        repo = self.__dict__.get('_repo')
+        if repo is None:
+            raise AttributeError(item)
+        return getattr(repo, item)
 
     def _open_repository(self) -> None:
         """open the repository"""
-        self._repo = Repo(str(self.path))
+        self._repo = Repo(self._path_str)
 
     def get_repo(self) -> Repo:
         """return the repository"""
@@ -61,38 +159,53 @@ class Repository:
 
     def get_config(self):
         """return git configuration"""
-        config = {}
-        with self._repo.config_reader() as git_config:
-            config['user.email'] = git_config.get_value('user', 'email')
-            config['user.name'] = git_config.get_value('user', 'name')
+        if self._config_cache is None:
+            config = {}
+            with self._repo.config_reader() as git_config:
+                config['user.email'] = git_config.get_value('user', 'email')
+                config['user.name'] = git_config.get_value('user', 'name')
+            self._config_cache = config
 
-        return config
+        return dict(self._config_cache)
 
     def get_info(self) -> dict:
         """return git information"""
-        info = {}
         master = self._repo.head.reference
-        lc = datetime.datetime.fromtimestamp(master.commit.committed_date)
-        last_commit = lc.strftime("%Y_%m_%d_%H%M%S")
-        info['current_branch'] = master.name
-        info['last_commit'] = last_commit
-        info['last_commit_id'] = master.commit.hexsha
-        info['last_commit_by'] = master.commit.author.name
-        info['last_commit_message'] = master.commit.message
-
-        return info
+        # each access of master.commit resolves the reference again
+        commit = master.commit
+        # HEAD may be moved outside of this object (checkout, commit or pull
+        # by git itself); the cached info is only used for the same commit
+        cache_key = (master.name, commit.hexsha)
+        if self._info_cache is not None and self._info_cache[0] == cache_key:
+            return dict(self._info_cache[1])
+
+        lc = datetime.datetime.fromtimestamp(commit.committed_date)
+        info = {
+            'current_branch': master.name,
+            'last_commit': lc.strftime("%Y_%m_%d_%H%M%S"),
+            'last_commit_id': commit.hexsha,
+            'last_commit_by': commit.author.name,
+            'last_commit_message': commit.message,
+        }
+        self._info_cache = (cache_key, info)
+
+        return dict(info)
 
     def get_last_commits(self, max_count:int, filename:str) -> list:
         """return last commits for a file"""
-        commits_for_file_generator = self._repo.iter_commits(
-            all=True, 
-            max_count=max_count, 
-            paths=filename)
-        return [c for c in commits_for_file_generator]
+        return list(self.iter_last_commits(filename, max_count=max_count, all=True))
 
-    def get_last_commits_of(self, path:str) -> list:
+    def get_last_commits_of(self, path:str, max_count:int=None) -> list:
         """get last commits of a path"""
-        return [commit for commit in self._repo.iter_commits(paths=path)]
+        return list(self.iter_last_commits(path, max_count=max_count))
+
+    def iter_last_commits(self, path:str, max_count:int=None, all:bool=False):
+        """iterate over the last commits of a path
+
+        The commits are read from git while iterating; stop early to avoid
+        walking the complete history.
+        """
+        return self._repo.iter_commits(all=all, max_count=max_count, paths=path)
 
     def get_revision(self, path):
         # for commit, filecontents in revlist:
@@ -101,10 +214,43 @@ class Repository:
             (commit, (commit.tree / path).data_stream.read()) for commit in self._repo.iter_commits(paths=path)
         )
 
-    def get_commits(self) -> list:
-        """get commits"""
-        commits = []
-        for commit in pyRepository(str(self.path)).traverse_commits():
+    def get_commits(self, since:datetime.datetime=None, to:datetime.datetime=None,
+                    only_in_branch:str=None, only_modifications_with_file_types:list=None) -> list:
+        """get commits
+
+        Parameters
+        ----------
+        since : datetime, optional
+            only commits after this date
+        to : datetime, optional
+            only commits up to this date
+        only_in_branch : str, optional
+            only commits of this branch
+        only_modifications_with_file_types : list, optional
+            only commits that modify files of these types (eg. ['.yaml'])
+
+        Returns
+        -------
+        list
+            one record per commit
+        """
+        return list(self.iter_commits(since=since, to=to, only_in_branch=only_in_branch,
+                                      only_modifications_with_file_types=only_modifications_with_file_types))
+
+    def iter_commits(self, since:datetime.datetime=None, to:datetime.datetime=None,
+                     only_in_branch:str=None, only_modifications_with_file_types:list=None):
+        """iterate over all commits and yield one record per commit
+
+        The filters are passed to pydriller (and git) so that commits outside
+        the range are not read at all. See get_commits for the parameters.
+        """
+        _join = ', '.join
+        filters = {'since': since,
+                   'to': to,
+                   'only_in_branch': only_in_branch,
+                   'only_modifications_with_file_types': only_modifications_with_file_types}
+        filters = {key: value for key, value in filters.items() if value is not None}
+        for commit in pyRepository(self._path_str, **filters).traverse_commits():
 
             hash = commit.hash
 
@@ -114,12 +260,12 @@ class Repository:
                 for f in commit.modified_files:
                     if f.new_path is not None:
                         files.append(f.new_path) 
-            except Exception:
-                print('Could not read files for commit ' + hash)
+            except _COMMIT_ERRORS:
+                _log_repo.warning('Could not read files for commit {}', hash)
                 continue
 
             # Capture information about the commit in object format so I can reference it later
-            record = {
+            yield {
                 'hash': hash,
                 'message': commit.msg,
                 'author_name': commit.author.name,
@@ -136,73 +282,84 @@ class Repository:
                 'num_inserts': commit.insertions,
                 'net_lines': commit.insertions - commit.deletions,
                 'num_files': commit.files,
-                'branches': ', '.join(commit.branches), # Comma separated list of branches the commit is found in
-                'files': ', '.join(files), # Comma separated list of files the commit modifies
-                'parents': ', '.join(commit.parents), # Comma separated list of parents
+                'branches': _join(commit.branches), # Comma separated list of branches the commit is found in
+                'files': _join(files), # Comma separated list of files the commit modifies
+                'parents': _join(commit.parents), # Comma separated list of parents
                 # PyDriller Open Source Delta Maintainability Model (OS-DMM) stat. See https://pydriller.readthedocs.io/en/latest/deltamaintainability.html for metric definitions
                 'dmm_unit_size': commit.dmm_unit_size,
                 'dmm_unit_complexity': commit.dmm_unit_complexity,
                 'dmm_unit_interfacing': commit.dmm_unit_interfacing,
             }
             # Omitted: modified_files (list), project_path, project_name
-            commits.append(record)
-        return commits
+
+    def iter_commits_summary(self, all:bool=False):
+        """iterate over all commits and yield the metadata of each commit
+
+        Unlike iter_commits this method reads the history using a single
+        'git log' call and does not inspect the modified files. Use it if
+        only hash, author, committer, parents and message are needed.
+
+        Parameters
+        ----------
+        all : bool, optional
+            walk all refs instead of the current branch only
+
+        Returns
+        -------
+        generator
+            one dict per commit; the dates are ISO 8601 strings
+        """
+        args = ['-z', f'--format={_LOG_FORMAT}']
+        if all:
+            args.append('--all')
+        output = self._repo.git.log(*args)
+        keys = _LOG_KEYS
+        for entry in output.split('\x00'):
+            if not entry:
+                continue
+            record = dict(zip(keys, entry.split('\x1f')))
+            record['parents'] = ', '.join(record['parents'].split())
+            record['message'] = record['message'].strip()
+            yield record
 
     def get_commits_details(self, diff:bool=False, diff_parsed:bool=False, 
-                            source:bool=False, source_before:bool=False) -> list:
+                            source:bool=False, source_before:bool=False,
+                            max_workers:int=None) -> list:
+        """get one record per modified file of each commit
+
+        Parsing the modified files (especially the diffs and sources) is CPU bound.
+        If max_workers is set, the commits are processed in a pool of processes.
+        """
+        if not max_workers or max_workers < 2:
+            return list(self.iter_commits_details(diff=diff, diff_parsed=diff_parsed,
+                                                  source=source, source_before=source_before))
+
+        path = self._path_str
+        jobs = [(path, commit.hash, diff, diff_parsed, source, source_before)
+                for commit in pyRepository(path).traverse_commits()]
         commits = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for records in executor.map(_extract_commit, jobs, chunksize=16):
+                commits.extend(records)
+        return commits
 
-        for commit in pyRepository(str(self.path)).traverse_commits():
+    def iter_commits_details(self, diff:bool=False, diff_parsed:bool=False, 
+                             source:bool=False, source_before:bool=False):
+        """iterate over all commits and yield one record per modified file"""
+        for commit in pyRepository(self._path_str).traverse_commits():
             hash = commit.hash
             try:
-                for f in commit.modified_files:
-                    record = {
-                        'hash': hash,
-                        'message': commit.msg,
-                        'author_name': commit.author.name,
-                        'author_email': commit.author.email,
-                        'author_date': str(commit.author_date),
-                        'author_tz': commit.author_timezone,
-                        'committer_name': commit.committer.name,
-                        'committer_email': commit.committer.email,
-                        'committer_date': str(commit.committer_date),
-                        'committer_tz': commit.committer_timezone,
-                        'in_main': commit.in_main_branch,
-                        'is_merge': commit.merge,
-                        'num_deletes': commit.deletions,
-                        'num_inserts': commit.insertions,
-                        'net_lines': commit.insertions - commit.deletions,
-                        'num_files': commit.files,
-                        'branches': ', '.join(commit.branches),
-                        'filename': f.filename,
-                        'old_path': f.old_path,
-                        'new_path': f.new_path,
-                        'nloc': f.nloc,
-                        'added_lines': f.added_lines,
-                        'deleted_lines': f.deleted_lines,
-                        'project_name': commit.project_name,
-                        'project_path': commit.project_path, 
-                        'parents': ', '.join(commit.parents),
-                    }
-                    if diff:
-                        record.update({'diff': f.diff})
-                    if diff_parsed:
-                        record.update({'diff_parsed': f.diff_parsed})
-                    if source:
-                        record.update({'source_code': f.source_code})
-                    if source_before:
-                        record.update({'source_code_before': f.source_code_before})
-                    commits.append(record)
-            except Exception:
-                print('Problem reading commit ' + hash)
+                yield from _file_records(commit, diff, diff_parsed, source, source_before)
+            except _COMMIT_ERRORS:
+                _log_repo.warning('Problem reading commit {}', hash)
                 continue 
-        return commits
 
     def set_config(self, key:str, sub_key:str, value:str) -> None:
         """set git configuration"""
         # eg. user.name = value
         with self._repo.config_writer() as config:
             config.set_value(key, sub_key, value)
+        self._config_cache = None
 
     def create_remote(self, remote_name:str, url:str) -> None:
         """create a remote"""
@@ -236,6 +393,7 @@ class Repository:
 
     def commit(self, comment:str=''):
         """commit changes"""
+        self._info_cache = None
         return self._repo.index.commit(comment)
 
     def push(self):
@@ -247,6 +405,7 @@ class Repository:
 
     def pull(self):
         """pull changes"""
+        self._info_cache = None
         if self._ssh_cmd:
             with self._repo.git.custom_environment(GIT_SSH_COMMAND=self._ssh_cmd):
                 return self._repo.remotes.origin.pull(env={"GIT_SSH_COMMAND": self._ssh_cmd })
@@ -254,7 +413,8 @@ class Repository:
 
     def commits(self, number_of_commits:int=5) -> list:
         """return list of commits"""
-        return list(self._repo.iter_commits('main'))[:number_of_commits]
+        # max_count stops git rev-list after the requested number of commits
+        return list(self._repo.iter_commits('main', max_count=number_of_commits))
 
     def branch(self) -> str:
         """return active branch"""
@@ -268,26 +428,25 @@ class Repository:
         """return branches"""
         return self._repo.branches
 
-    def get(self, filename):
-        """get file content"""
+    def get(self, filename, binary:bool=False):
+        """get file content (bytes if binary is True)"""
         # check if path exists
-        local_path = Path("%s/%s" % (self.path, filename))
+        local_path = self.path / filename
         if local_path.is_file():
-            return local_path.read_text()
+            return local_path.read_bytes() if binary else local_path.read_text()
         else:
             logger.error(f'file {local_path} does not exists')
             return None
 
     def write(self, filename:str, content) -> bool:
-        """write content to file"""
-        local_path = Path("%s/%s" % (self.path, filename))
+        """write content (str or bytes) to file"""
+        local_path = self.path / filename
         try:
-            with open(local_path, "w") as filehandler:
-                filehandler.write(content)
-                filehandler.close()
-                return True
-        except Exception as exc:
-            logger.error(f'could not write {local_path}; got exception {exc}')
-            return False
-
-        return False
\ No newline at end of file
+            if isinstance(content, (bytes, bytearray)):
+                local_path.write_bytes(content)
+            else:
+                local_path.write_text(content)
+            return True
+        except OSError as exc:
+            logger.error('could not write {}; got exception {}', local_path, exc)
+            return False
\ No newline at end of file
@@ -1,4 +1,169 @@
-from dataclasses import dataclass, field, fields, is_dataclass, asdict
+import json
+import os
+import sys
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, is_dataclass, asdict, replace
+from functools import lru_cache
+from typing import Union, get_args, get_origin
+
+try:
+    # orjson is optional; it is used by to_json if it is installed
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# objects created by nested_dataclass are checked by check_type unless
+# VERITAS_TYPECHECK is set to 0 (eg. in production)
+_TYPECHECK = os.getenv('VERITAS_TYPECHECK', '1').lower() not in ('0', 'false', 'no')
+
+# dataclass(slots=True) needs python 3.10; older versions use __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _get_field(data, name:str):
+    """return the value of the field name of data (KeyError if there is no such field)"""
+    if name not in data.__dataclass_fields__:
+        raise KeyError(name)
+    return getattr(data, name)
+
+
+@lru_cache(maxsize=4096)
+def _split_path(path:str) -> tuple:
+    """split 'a.b.c' into the first key and the remaining path ('a', 'b.c')"""
+    head, _, remaining = path.partition('.')
+    return head, remaining
+
+
+@lru_cache(maxsize=None)
+def _build_validator(field_type):
+    """return a function that checks if a value matches field_type
+
+    The annotation is resolved once per type: list[int] is checked as list
+    and Optional[str] / Union[...] as one of its arguments.
+    """
+    origin = get_origin(field_type)
+    if origin is None:
+        expected = field_type
+    elif origin is Union:
+        expected = tuple(get_origin(arg) or arg for arg in get_args(field_type))
+    else:
+        expected = origin
+    if not isinstance(expected, (type, tuple)):
+        # eg. typing.Any; nothing to check
+        return lambda value: True
+    return lambda value: isinstance(value, expected)
+
+
+@lru_cache(maxsize=None)
+def _validators(check_class) -> tuple:
+    """return (name, validator, field_type) of each annotated field of check_class"""
+    return tuple((name, _build_validator(field_type), field_type)
+                 for name, field_type in check_class.__annotations__.items())
+
+
+# values that are returned as they are by to_dict
+_ATOMIC_TYPES = frozenset((str, int, float, bool, type(None)))
+# classes with a generated to_dict method
+_TO_DICT_CLASSES = set()
+
+
+@lru_cache(maxsize=128)
+def _is_dataclass_type(value_type) -> bool:
+    """return True if value_type is a dataclass (cached per type)"""
+    return is_dataclass(value_type)
+
+
+def _to_value(value):
+    """convert value the same way dataclasses.asdict does"""
+    value_type = type(value)
+    if value_type in _ATOMIC_TYPES:
+        return value
+    if value_type is list:
+        return [_to_value(item) for item in value]
+    if value_type is dict:
+        return {_to_value(key): _to_value(item) for key, item in value.items()}
+    if value_type in _TO_DICT_CLASSES:
+        return value.to_dict()
+    if _is_dataclass_type(value_type):
+        return asdict(value)
+    if isinstance(value, (list, tuple)):
+        return value_type(_to_value(item) for item in value)
+    if isinstance(value, dict):
+        return value_type((_to_value(key), _to_value(item)) for key, item in value.items())
+    return deepcopy(value)
+
+
+def _is_empty(value) -> bool:
+    """return True if value is None, '' or an empty list or dict"""
+    # most values are not empty; a single truth test is enough for them
+    if value:
+        return False
+    # 0 and False are falsy but not empty
+    return value is None or value == '' or isinstance(value, (list, dict))
+
+
+def _clean_value(value):
+    """convert value like _to_value and remove the empty values of all (nested) dicts"""
+    value_type = type(value)
+    if value_type in _ATOMIC_TYPES:
+        return value
+    if value_type in _TO_DICT_CLASSES:
+        return value._clean()
+    if value_type is list:
+        return [_clean_value(item) for item in value]
+    if isinstance(value, dict):
+        # also dict subclasses like benedict
+        cleaned = {}
+        for key, item in value.items():
+            item = _clean_value(item)
+            if not _is_empty(item):
+                cleaned[key] = item
+        return cleaned
+    value = _to_value(value)
+    if type(value) is dict:
+        # eg. a dataclass that is not part of the datamodel
+        return _clean_value(value)
+    return value
+
+
+def _generate(data_class, name:str, lines:list) -> None:
+    """compile the source lines of a method and add it as name to data_class"""
+    namespace = {'_to_value': _to_value, '_clean_value': _clean_value, '_is_empty': _is_empty,
+                 '_ATOMIC_TYPES': _ATOMIC_TYPES}
+    exec(compile('\n'.join(lines), f'<{data_class.__name__}.{name}>', 'exec'), namespace)
+    setattr(data_class, name, namespace[name])
+
+
+def with_to_dict(data_class):
+    """add the generated methods to_dict and _clean to data_class
+
+    to_dict is a faster dataclasses.asdict; _clean returns the same dict
+    without empty values (None, '', [] and {}).
+    Both methods are generated once per class and read each field directly.
+    to_dict returns values of type str, int, float, bool or None as they are
+    and converts (and copies) all other values by _to_value. _clean does the
+    same with _clean_value, which also drops the empty values of nested dicts.
+    """
+    to_dict = ['def to_dict(self):', '    props = {}']
+    clean = ['def _clean(self):', '    props = {}']
+    for data_field in fields(data_class):
+        name = data_field.name
+        # the annotation is not enforced (eg. platform: str holds a dict);
+        # only values that are atomic at runtime are used as they are
+        to_dict.append(f'    value = self.{name}')
+        to_dict.append(f'    props[{name!r}] = value if type(value) in _ATOMIC_TYPES else _to_value(value)')
+        clean.append(f'    value = self.{name}')
+        clean.append('    if type(value) not in _ATOMIC_TYPES:')
+        clean.append('        value = _clean_value(value)')
+        clean.append('    if not _is_empty(value):')
+        clean.append(f'        props[{name!r}] = value')
+    to_dict.append('    return props')
+    clean.append('    return props')
+    _generate(data_class, 'to_dict', to_dict)
+    _generate(data_class, '_clean', clean)
+    _TO_DICT_CLASSES.add(data_class)
+    return data_class
 
 
 # decorator to wrap original __init__ 
@@ -7,41 +172,56 @@ def nested_dataclass(*args, **kwargs):
         # passing class to investigate 
         check_class = dataclass(check_class, **kwargs) 
         o_init = check_class.__init__ 
+        # the fields that are dataclasses themselves; resolved once per class
+        nested_fields = tuple((name, ft) for name, ft in check_class.__annotations__.items()
+                              if is_dataclass(ft))
 
         def __init__(self, *args, **kwargs): 
-            for name, value in kwargs.items():
-                # getting field type
-                ft = check_class.__annotations__.get(name, None)
-                if is_dataclass(ft) and isinstance(value, dict): 
-                    obj = ft(**value) 
-                    kwargs[name]= obj 
-                o_init(self, *args, **kwargs)
-            self.check_type()
+            for name, ft in nested_fields:
+                value = kwargs.get(name)
+                # dict subclasses (eg. benedict) are converted as well
+                if isinstance(value, dict): 
+                    kwargs[name] = ft(**value) 
+            # init and check the object once all nested values are converted
+            o_init(self, *args, **kwargs)
+            if _TYPECHECK:
+                self.check_type()
         check_class.__init__=__init__
+        # resolve the validators of check_type once per class
+        _validators(check_class)
         return check_class 
     return wrapper(args[0]) if args else wrapper 
 
-@dataclass
+@with_to_dict
+@dataclass(frozen=True, **_SLOTS)
 class StatusData():
+    # StatusData is immutable so that the default status can be shared;
+    # use dataclasses.replace to get a modified status
     name: str = "Active"
 
     def __getitem__(self, property_name):
-        return self.__dict__[property_name]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        self.__dict__[name] = value
+        raise TypeError(f'StatusData is immutable and {name} cannot be set; '
+                        f'use dataclasses.replace(status, {name}=...) instead')
 
-@dataclass
+# status of all objects that are created without a status
+_DEFAULT_STATUS = StatusData()
+
+@with_to_dict
+@dataclass(**_SLOTS)
 class RoleData():
     name: str = "network"
 
     def __getitem__(self, property_name):
-        return self.__dict__[property_name]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        self.__dict__[name] = value
+        setattr(self, name, value)
 
-@dataclass
+@with_to_dict
+@dataclass(**_SLOTS)
 class TenantData():
     name: str
     group : str = None
@@ -49,22 +229,26 @@ class TenantData():
     tags: list[list] = field(default_factory=list)
 
     def __getitem__(self, property_name):
-        keys = property_name.split('.')
-        remaining = '.'.join(keys[1:])
-        if len(keys) > 1 and keys[0] == 'tags':
+        if '.' not in property_name:
+            return _get_field(self, property_name)
+        head, remaining = _split_path(property_name)
+        if remaining and head == 'tags':
             return self.tags.__getitem__(remaining)
         else:
-            return self.__dict__[property_name]
+            return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        keys = name.split('.')
-        remaining = '.'.join(keys[1:])
-        if keys[0] == 'tags':
+        if '.' not in name:
+            setattr(self, name, value)
+            return
+        head, remaining = _split_path(name)
+        if head == 'tags':
             self.tags.__setitem__(remaining, value)
         else:
-            self.__dict__[name] = value
+            setattr(self, name, value)
 
-@dataclass
+@with_to_dict
+@dataclass(**_SLOTS)
 class LocationData():
     name : str
     location_type: str
@@ -72,12 +256,13 @@ class LocationData():
     status: str = "Active"
 
     def __getitem__(self, property_name):
-        return self.__dict__[property_name]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        self.__dict__[name] = value
+        setattr(self, name, value)
 
-@dataclass
+@with_to_dict
+@dataclass(**_SLOTS)
 class RackData():
     position: int = None
     group: str = None
@@ -85,43 +270,57 @@ class RackData():
     face: str = None
 
     def __getitem__(self, property_name):
-        return self.__dict__[property_name]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        self.__dict__[name] = value
+        setattr(self, name, value)
 
-@dataclass
+@with_to_dict
+@dataclass(**_SLOTS)
 class IPaddressData():
     address: str
     status: StatusData = None
 
     def __getitem__(self, property_name):
-        keys = property_name.split('.')
-        remaining = '.'.join(keys[1:])
-        if len(keys) > 1 and keys[0] == 'status':
+        if '.' not in property_name:
+            return _get_field(self, property_name)
+        head, remaining = _split_path(property_name)
+        if remaining and head == 'status':
             return self.status.__getitem__(remaining)
         else:
-            return self.__dict__[property_name]
+            return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        keys = name.split('.')
-        remaining = '.'.join(keys[1:])
-        if keys[0] == 'status':
-            self.status.__setitem__(remaining, value)
+        if '.' not in name:
+            setattr(self, name, value)
+            return
+        head, remaining = _split_path(name)
+        if remaining and head == 'status':
+            self.status = replace(self.status, **{remaining: value})
         else:
-            self.__dict__[name] = value
+            setattr(self, name, value)
 
     def __post_init__(self):
-        if not self.status:
-            self.status = StatusData()
-        elif isinstance(self.status, str):
-            self.status = StatusData(name=self.status)
-        elif isinstance(self.status, dict):
-            self.status = StatusData(**self.status)
-        elif not isinstance(self.status, StatusData):
-            raise ValueError('status must be of type StatusData')
-
-@dataclass
+        status = self.status
+        if not status:
+            self.status = _DEFAULT_STATUS
+            return
+        status_type = type(status)
+        if status_type is str:
+            self.status = StatusData(name=status)
+        elif status_type is dict:
+            self.status = StatusData(**status)
+        elif status_type is not StatusData:
+            # the exact types above are the fast path; subclasses (eg. benedict) are accepted as well
+            if isinstance(status, str):
+                self.status = StatusData(name=status)
+            elif isinstance(status, dict):
+                self.status = StatusData(**status)
+            elif not isinstance(status, StatusData):
+                raise ValueError('status must be of type StatusData')
+
+@with_to_dict
+@dataclass(**_SLOTS)
 class InterfaceData():
     name: str
     type: str
@@ -133,53 +332,55 @@ class InterfaceData():
     tagged_vlans: list[dict] = field(default_factory=dict)
 
     def __getitem__(self, property_name):
-        return self.__dict__[property_name]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        self.__dict__[name] = value
+        setattr(self, name, value)
     
     def __post_init__(self):
-        if not self.ip_addresses:
+        ip_addresses = self.ip_addresses
+        if not ip_addresses:
             self.ip_addresses = []
-        elif isinstance(self.ip_addresses, list):
+        elif type(ip_addresses) is list or isinstance(ip_addresses, list):
             ip_list = []
-            for item in self.ip_addresses:
-                if isinstance(item, dict):
-                    ip = IPaddressData(**item)
-                    ip_list.append(ip)
-                elif not isinstance(item, IPaddressData):
+            for item in ip_addresses:
+                item_type = type(item)
+                if item_type is dict:
+                    ip_list.append(IPaddressData(**item))
+                elif item_type is IPaddressData or isinstance(item, IPaddressData):
+                    ip_list.append(item)
+                elif isinstance(item, dict):
+                    ip_list.append(IPaddressData(**item))
+                else:
                     raise ValueError('ip_addresses must be of type IPaddressData')
             self.ip_addresses = ip_list
-        elif not isinstance(self.ip_addresses, list):
+        else:
             raise ValueError('ip_addresses must be of type list')
 
-        if not self.untagged_vlan:
+        untagged_vlan = self.untagged_vlan
+        if not untagged_vlan:
             self.untagged_vlan = []
-        elif isinstance(self.untagged_vlan, list):
-            vlan_list = []
-            for item in self.untagged_vlan:
-                if isinstance(item, dict):
-                    vlan_list.append(item)
-                else:
+        elif type(untagged_vlan) is list or isinstance(untagged_vlan, list):
+            for item in untagged_vlan:
+                if type(item) is not dict and not isinstance(item, dict):
                     raise ValueError('untagged_vlan must be of type dict')
-            self.untagged_vlan = vlan_list
-        elif not isinstance(self.untagged_vlan, list):
+            self.untagged_vlan = list(untagged_vlan)
+        else:
             raise ValueError('untagged_vlan must be of type list')
 
-        if not self.tagged_vlans:
+        tagged_vlans = self.tagged_vlans
+        if not tagged_vlans:
             self.tagged_vlans = []
-        elif isinstance(self.tagged_vlans, list):
-            vlan_list = []
-            for item in self.tagged_vlans:
-                if isinstance(item, dict):
-                    vlan_list.append(item)
-                else:
+        elif type(tagged_vlans) is list or isinstance(tagged_vlans, list):
+            for item in tagged_vlans:
+                if type(item) is not dict and not isinstance(item, dict):
                     raise ValueError('tagged_vlans must be of type dict')
-            self.tagged_vlans = vlan_list
-        elif not isinstance(self.tagged_vlans, list):
+            self.tagged_vlans = list(tagged_vlans)
+        else:
             raise ValueError('tagged_vlans must be of type list')
 
-@dataclass
+@with_to_dict
+@dataclass(**_SLOTS)
 class DeviceData():
     # name, role, devive_type, status and location are mandatory
     name: str
@@ -206,76 +407,84 @@ class DeviceData():
     tags: list[int] = field(default_factory=list)
     custom_fields: dict = field(default_factory=dict)
 
+    # fields that are accessed by a dotted name (eg. location.name)
+    _NESTED = {'location': LocationData, 'rack': RackData, 'status': StatusData}
+
     @classmethod
     def from_payload(cls, payload: dict):
         return cls(**payload)
 
     def check_type(self):
-        for name, field_type in self.__annotations__.items():
-            if name in self.__dict__:
-                provided_key = self.__dict__[name]
-            else:
-                continue
+        for name, validator, field_type in _validators(type(self)):
+            provided_key = getattr(self, name, None)
 
             # we ignore fields that are not provided (are None)
             if not provided_key:
                 continue
 
-            try:
-                type_matches = isinstance(provided_key, field_type)
-            except TypeError:
-                type_matches = isinstance(provided_key, field_type.__args__)
-
-            if not type_matches:
+            if not validator(provided_key):
                 raise TypeError(
                     f"The field '{name}' is of type '{type(provided_key)}', but "
                     f"should be of type '{field_type}' instead."
                 )
 
     def __getitem__(self, property_name):
-        keys = property_name.split('.')
-        remaining = '.'.join(keys[1:])
-        if len(keys) > 1 and keys[0] == 'location':
-            return self.location.__getitem__(remaining)
-        elif len(keys) > 1 and keys[0] == 'rack':
-            return self.rack.__getitem__(remaining)
-        else:
-            return self.__dict__[property_name]
+        if '.' not in property_name:
+            return _get_field(self, property_name)
+        head, remaining = _split_path(property_name)
+        if remaining and head in self._NESTED:
+            return getattr(self, head)[remaining]
+        return _get_field(self, property_name)
 
     def __setitem__(self, name, value):
-        keys = name.split('.')
-        remaining = '.'.join(keys[1:])
-        if keys[0] == 'location':
-            if not self.location:
-                self.location = LocationData()
-            self.location.__setitem__(remaining, value)
-        elif keys[0] == 'rack':
-            if not self.rack:
-                self.rack = RackData()
-            self.rack.__setitem__(remaining, value)
-        elif keys[0] == 'status':
-            if not self.status:
-                self.status = StatusData()
-            self.status.__setitem__(remaining, value)
-        else:
+        if '.' not in name:
             if name not in self.__annotations__:
                 raise AttributeError (f"Attribute {name} not found in DeviceData")
+            setattr(self, name, value)
+            return
+        head, remaining = _split_path(name)
+        nested_class = self._NESTED.get(head)
+        if remaining and nested_class is not None:
+            nested = getattr(self, head) or nested_class()
+            if isinstance(nested, StatusData):
+                # StatusData is immutable; a status of a payload may still be a dict
+                nested = replace(nested, **{remaining: value})
+            else:
+                nested[remaining] = value
+            setattr(self, head, nested)
+        else:
+            raise AttributeError (f"Attribute {name} not found in DeviceData")
 
     # public methods
 
     def clean(self):
-        props = asdict(self)
-        self.remove_empty_values(props)
-        return props
+        return self._clean()
+
+    def to_json(self) -> bytes:
+        """return the cleaned device as (utf-8 encoded) JSON
+
+        orjson is used if it is installed, otherwise the json module.
+        """
+        props = self.clean()
+        if orjson is not None:
+            return orjson.dumps(props)
+        return json.dumps(props, separators=(',', ':')).encode('utf-8')
 
     def remove_empty_values(self, dictionary:dict):
-        # run recusively through dictionary and remove empty values
-        for key, value in list(dictionary.items()):
-            if isinstance(value, dict):
-                self.remove_empty_values(value)
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, dict):
-                        self.remove_empty_values(item)
-            if value in [None, '', [], {}]:
-                del dictionary[key]
+        # remove empty values of the dictionary and all nested dicts (also in lists)
+        # collect the dicts first; cleaning them in reverse order cleans the
+        # nested dicts before their parent so that emptied dicts are removed too
+        dicts = []
+        stack = [dictionary]
+        while stack:
+            current = stack.pop()
+            dicts.append(current)
+            for value in current.values():
+                if isinstance(value, dict):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack.extend(item for item in value if isinstance(item, dict))
+        for current in reversed(dicts):
+            for key, value in list(current.items()):
+                if _is_empty(value):
+                    del current[key]
@@ -1,9 +1,15 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 
 # veritas
 from veritas.tools import tools
 from veritas.tools import exceptions as veritas_exceptions
 
+# all tags of a nautobot (base url -> (expires, {name: tag})); tags rarely change
+_TAG_TTL = 600
+_TAG_CACHE = {}
+
 class Device:
     """Device class to interact with nautobot to update devices and interfaces
 
@@ -19,10 +25,77 @@ class Device:
         self._sot = sot
         self._device = device
         self._interface = None
+        # cached nautobot device and interface; see _get_device and _get_interface
+        self._device_obj = None
+        self._interface_obj = None
 
         # open connection to nautobot
         self._nautobot = self._sot.open_nautobot()
 
+    def _get_device(self):
+        """return the nautobot device (cached until it is updated or deleted)"""
+        if self._device_obj is None:
+            self._device_obj = self._nautobot.dcim.devices.get(name=self._device)
+        return self._device_obj
+
+    def _get_interface(self):
+        """return the nautobot interface (cached until it is updated, deleted or another interface is set)"""
+        if self._interface_obj is None:
+            self._interface_obj = self._nautobot.dcim.interfaces.get(
+                device=[self._device],
+                name=self._interface)
+        return self._interface_obj
+
+    def _get_device_tags(self) -> list:
+        """get the tags of the device using a single graphql query
+
+        The REST API returns the tags of a device as nested objects without
+        names; reading tag.name would fetch each tag separately.
+
+        Returns
+        -------
+        list
+            list of dicts (id and name) or None if the device is unknown
+        """
+        devices = self._sot.get.query(select=['id', 'tags'],
+                                      using='nb.devices',
+                                      where={'devices': {'name': [self._device]}},
+                                      mode='gql')
+        if not devices:
+            return None
+        return devices[0].get('tags') or []
+
+    def _get_tags(self, tag_names:list) -> dict:
+        """get the nautobot tags of a list of names from the cached tag table
+
+        Parameters
+        ----------
+        tag_names : list
+            names of the tags
+
+        Returns
+        -------
+        dict
+            tag name -> tag; unknown tags are missing
+        """
+        if not tag_names:
+            return {}
+        tags = self._all_tags()
+        if any(name not in tags for name in tag_names):
+            # the tag may have been added since the tags were cached
+            tags = self._all_tags(refresh=True)
+        return {name: tags[name] for name in tag_names if name in tags}
+
+    def _all_tags(self, refresh:bool=False) -> dict:
+        """return all tags of nautobot (tag name -> tag); cached for _TAG_TTL seconds"""
+        key = self._nautobot.base_url
+        now = time.monotonic()
+        cached = _TAG_CACHE.get(key)
+        if refresh or cached is None or cached[0] <= now:
+            cached = (now + _TAG_TTL, {tag.name: tag for tag in self._nautobot.extras.tags.all()})
+            _TAG_CACHE[key] = cached
+        return cached[1]
+
     def interface(self, interface_name:str) -> None:
         """set interface name
 
@@ -40,6 +113,8 @@ class Device:
         -------
         None
         """        
+        if interface_name != self._interface:
+            self._interface_obj = None
         self._interface = interface_name
         return self
 
@@ -79,9 +154,11 @@ class Device:
             true if successful, false otherwise
         """
         logger.debug(f'updating device {self._device}')
-        device = self._nautobot.dcim.devices.get(name=self._device)
+        device = self._get_device()
         if device:
             try:
+                # the object is modified; get it again next time
+                self._device_obj = None
                 update = device.update(properties)
                 if update:
                     logger.debug(f'device {self._device} updated')
@@ -114,9 +191,7 @@ class Device:
         """
         logger.debug(f'updating interface {self._device} / {self._interface}')
 
-        interface = self._nautobot.dcim.interfaces.get(
-                    device=[self._device],
-                    name=self._interface)
+        interface = self._get_interface()
 
         if not interface:
             logger.error(f'unknown interface {self._interface} on {self._device}')
@@ -124,6 +199,8 @@ class Device:
                 f'interface {self._interface} not found',
                 additional_info=f'properties {properties}')
         try:
+            # the object is modified; get it again next time
+            self._interface_obj = None
             update = interface.update(properties)
             if update:
                 logger.debug(f'interface {self._interface} updated')
@@ -147,9 +224,11 @@ class Device:
         """delete device or interface
         """
         logger.debug(f'deleting device {self._device}')
-        device = self._nautobot.dcim.devices.get(name=self._device)
+        device = self._get_device()
         if device:
             try:
+                # the object is modified; get it again next time
+                self._device_obj = None
                 delete = device.delete()
                 if delete:
                     logger.debug(f'device {self._device} deleted')
@@ -178,15 +257,15 @@ class Device:
         """
         logger.debug(f'deleteing interface {self._device} / {self._interface}')
 
-        interface = self._nautobot.dcim.interfaces.get(
-                    device=[self._device],
-                    name=self._interface)
+        interface = self._get_interface()
 
         if not interface:
             logger.error(f'unknown interface {self._device} / {self._interface}')
             raise veritas_exceptions.UnknownInterfaceError(
                 f'interface {self._interface} not found')
         try:
+            # the object is modified; get it again next time
+            self._interface_obj = None
             delete = interface.delete()
             if delete:
                 logger.debug(f'interface {self._device} / {self._interface}')
@@ -235,24 +314,25 @@ class Device:
             return self.add_interface_tags(new_tags, set_tag=False)
 
         final_list = []
+        # unique tags in the given order; the list of the caller is not modified
+        new_tags = list(dict.fromkeys(new_tags))
 
         if not set_tag:
             # if the device already exists there may also be tags
-            device = self._nautobot.dcim.devices.get(name=self._device)
-            if device is None:
-                logger.error(f'unknown device {self._device_name}')
+            current_tags = self._get_device_tags()
+            if current_tags is None:
+                logger.error(f'unknown device {self._device}')
                 return False
 
-            for tag in device.tags:
-                if tag.name not in new_tags:
-                    new_tags.append(tag.name)
+            new_tags = list(dict.fromkeys(new_tags + [tag['name'] for tag in current_tags]))
 
-            logger.debug(f'current tags: {device.tags}')
+            logger.debug(f'current tags: {current_tags}')
             logger.debug(f'updating tags to {new_tags}')
 
         # check if new tag is known; add id to final list
+        known_tags = self._get_tags(new_tags)
         for new_tag in new_tags:
-            tag = self._nautobot.extras.tags.get(name=new_tag)
+            tag = known_tags.get(new_tag)
             if tag is None:
                 logger.error(f'unknown tag {new_tag}')
                 raise veritas_exceptions.UnknownValueError(f'unknown tag {new_tag}')
@@ -283,17 +363,18 @@ class Device:
         logger.debug(f'deleting tags {tags_to_delete} on {self._device}')
 
         # the device must exist; get tags
-        device = self._nautobot.dcim.devices.get(name=self._device)
-        if device is None:
+        tags = self._get_device_tags()
+        if tags is None:
             logger.error(f'unknown device {self._device}')
             return None
 
         device_tags = []
         current_tags = []
-        for tag in device.tags:
-            current_tags.append(tag.name)
-            if tag.name not in tags_to_delete:
-                device_tags.append(tag)
+        delete_set = set(tags_to_delete)
+        for tag in tags:
+            current_tags.append(tag['name'])
+            if tag['name'] not in delete_set:
+                device_tags.append(tag['id'])
 
         logger.debug(f'current tags: {current_tags}')
         logger.debug(f'new tags {device_tags}')
@@ -318,9 +399,7 @@ class Device:
         """        
         final_list = []
 
-        interface = self._nautobot.dcim.interfaces.get(
-                    device=[self._device],
-                    name=self._interface)
+        interface = self._get_interface()
 
         if not interface:
             logger.error(f'unknown interface {self._interface} on {self._device}')
@@ -328,17 +407,18 @@ class Device:
                 f'interface {self._interface} not found',
                 additional_info=f'new_tags={new_tags} set_tag={set_tag}')
 
+        # unique tags in the given order; the list of the caller is not modified
+        new_tags = list(dict.fromkeys(new_tags))
         if not set_tag:
-            for tag in interface.tags:
-                if tag.name not in new_tags:
-                    new_tags.append(tag.name)
+            new_tags = list(dict.fromkeys(new_tags + [tag.name for tag in interface.tags]))
 
             logger.debug(f'current tags: {interface.tags}')
             logger.debug(f'updating tags to {new_tags}')
 
         # check if new tag is known; add id to final list
+        known_tags = self._get_tags(new_tags)
         for new_tag in new_tags:
-            tag = self._nautobot.extras.tags.get(name=new_tag)
+            tag = known_tags.get(new_tag)
             if tag is None:
                 logger.error(f'unknown tag {new_tag}')
             else:
@@ -348,6 +428,8 @@ class Device:
             properties = {'tags': final_list}
             logger.debug(f'final list of tags {properties}')
             try:
+                # the object is modified; get it again next time
+                self._interface_obj = None
                 return interface.update(properties)
             except Exception as exc:
                 logger.error(f'failed to update interface; got exception {exc}')
@@ -370,9 +452,7 @@ class Device:
         """        
         logger.debug(f'deleting tags {tags_to_delete} on {self._device}/{self._interface}')
 
-        interface = self._nautobot.dcim.interfaces.get(
-                    device=[self._device],
-                    name=self._interface)
+        interface = self._get_interface()
 
         if not interface:
             logger.error(f'unknown interface {self._interface} on {self._device}')
@@ -382,9 +462,10 @@ class Device:
 
         interface_tags = []
         current_tags = []
+        delete_set = set(tags_to_delete)
         for tag in interface.tags:
             current_tags.append(tag.name)
-            if tag.name not in tags_to_delete:
+            if tag.name not in delete_set:
                 interface_tags.append(tag)
 
         logger.debug(f'current tags: {current_tags}')
@@ -392,6 +473,8 @@ class Device:
 
         properties = {'tags': interface_tags}
         try:
+            # the object is modified; get it again next time
+            self._interface_obj = None
             return interface.update(properties)
         except Exception as exc:
             logger.error(f'failed to delete tag; got exception {exc}')
@@ -415,9 +498,11 @@ class Device:
         if self._interface:
             return self.set_interface_customfield(properties)
 
-        device = self._nautobot.dcim.devices.get(name=self._device)
+        device = self._get_device()
         if device:
             try:
+                # the object is modified; get it again next time
+                self._device_obj = None
                 update = device.update(properties)
                 logger.debug(f'device updated result={update}')
                 return update
@@ -447,9 +532,7 @@ class Device:
         bool
             true if successful, false otherwise
         """        
-        interface = self._nautobot.dcim.interfaces.get(
-                    device=[self._device],
-                    name=self._interface)
+        interface = self._get_interface()
 
         if not interface:
             logger.error(f'unknown interface {self._interface} on {self._device}')
@@ -457,9 +540,46 @@ class Device:
                 f'interface {self._interface} not found',
                 additional_info=f'properties {properties}')
         try:
+            # the object is modified; get it again next time
+            self._interface_obj = None
             return interface.update(properties)
         except Exception as exc:
             logger.error(f'failed to update interface; got exception {exc}')
             raise veritas_exceptions.UpdateInterfaceError(
                     f'failed to update interface {self._device} / {self._interface}; exception={exc}',
                     additional_info=f'properties {properties}')
+
+
+def bulk_update(sot, devices:list, properties:dict, max_workers:int=8) -> dict:
+    """update the same properties on many devices concurrently
+
+    Each update is a blocking HTTP request; the requests are sent by a pool
+    of threads that share the (pooled) nautobot session of the sot.
+
+    Parameters
+    ----------
+    sot : Sot
+        Sot object
+    devices : list
+        names of the devices to update
+    properties : dict
+        properties to update
+    max_workers : int, optional
+        maximum number of parallel requests, by default 8
+
+    Returns
+    -------
+    dict
+        device name -> True if the device was updated, False otherwise
+    """
+    def _update(device):
+        try:
+            return bool(Device(sot, device).update_device(properties))
+        except Exception as exc:
+            logger.error(f'failed to update device {device}; exc={exc}')
+            return False
+
+    # open the connection before the threads use it
+    sot.open_nautobot()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(devices, executor.map(_update, devices)))
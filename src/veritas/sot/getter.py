@@ -1,3 +1,5 @@
+import time
+from functools import wraps
 from loguru import logger
 from pynautobot import models
 
@@ -5,6 +7,30 @@ from pynautobot import models
 from veritas.sot import queries
 from veritas.sot import rest as veritas_rest
 
+# seconds the result of rarely changing objects (platforms, roles, choices...) is cached
+_STATIC_TTL = 3600
+
+
+def _ttl_cached(ttl:int):
+    """cache the result of a Getter method for ttl seconds
+
+    The results are cached per Getter and per arguments. The cached object
+    is returned to every caller; do not modify it.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            value = method(self, *args, **kwargs)
+            self._cache[key] = (now + ttl, value)
+            return value
+        return wrapper
+    return decorator
+
 
 class Getter(object):
     """Getter class to get properties from nautobot
@@ -19,6 +45,8 @@ class Getter(object):
         self._sot = sot
         self._api = "pynautobot"
         self._nautobot = self._sot.open_nautobot()
+        # (method, args, kwargs) -> (expires, result); see _ttl_cached
+        self._cache = {}
 
     # -----===== user command =====-----
 
@@ -247,7 +275,7 @@ class Getter(object):
         return self._nautobot.dcim.interfaces.get(device_id=device_id, 
                                                   name=interface_name)
 
-    def interfaces(self, device:str, device_id:str=None) -> models.dcim.Interfaces:
+    def interfaces(self, device:str=None, device_id:str=None, names:list=None) -> models.dcim.Interfaces:
         """get all interfaces by device or device_id
 
         Parameters
@@ -256,6 +284,8 @@ class Getter(object):
             name of the device
         device_id : str
             device id
+        names : list, optional
+            only get interfaces with these names, by default None (all interfaces)
 
         Returns
         -------
@@ -263,17 +293,21 @@ class Getter(object):
             all interfaces of the device
         """
         if self._api == "rest":
-            if device_id:
-                return self._rest.get(url=f"api/dcim/interfaces/?device_id={device_id}&depth={self._depth}", format="json")
-            else:
-                return self._rest.get(url=f"api/dcim/interfaces/?device={device}&depth={self._depth}", format="json")
-
+            # requests encodes the parameters (eg. interface names with a slash or
+            # a space) and sends one name=... for each element of the list
+            params = {'device_id': device_id} if device_id else {'device': device}
+            if names:
+                params['name'] = list(names)
+            params['depth'] = self._depth
+            return self._rest.get(url="api/dcim/interfaces/", params=params, format="json")
+
+        name_filter = {'name': names} if names else {}
         if device_id:
             logger.debug(f'getting ALL Interface of ID {device_id}')
-            return self._nautobot.dcim.interfaces.filter(device_id=device_id)
+            return self._nautobot.dcim.interfaces.filter(device_id=device_id, **name_filter)
         else:
             logger.debug(f'getting ALL Interface of {device}')
-            return self._nautobot.dcim.interfaces.filter(device=device)
+            return self._nautobot.dcim.interfaces.filter(device=device, **name_filter)
 
     def vlans(self,  *unnamed:list, **named:dict) -> list:
         """get vlans from nautobot
@@ -347,9 +381,14 @@ class Getter(object):
         logger.debug(f'getting core attributes of device {device}')
         return self.query(select=select, using=using, where=where)
 
+    def clear_cache(self) -> None:
+        """clear the cached platforms, roles, device types, custom field types and choices"""
+        self._cache.clear()
+
     def changes(self, *unnamed, **named):
         pass
 
+    @_ttl_cached(_STATIC_TTL)
     def all_custom_fields_type(self, get_list:bool=False) -> dict | list:
         """return a list or dict of all custom_fields_type
 
@@ -372,6 +411,7 @@ class Getter(object):
                 response[t.display] = {'type': str(t.type)}
             return response
 
+    @_ttl_cached(_STATIC_TTL)
     def all_device_types(self, get_list:bool=False) -> dict | list:
         """get a list or dict of all device types
 
@@ -394,6 +434,7 @@ class Getter(object):
                 response[t.display] = {'model': t.model}
             return response
 
+    @_ttl_cached(_STATIC_TTL)
     def get_all_roles(self, get_list:bool=False) -> dict | list:
         """get all roles from nautobot
 
@@ -416,6 +457,7 @@ class Getter(object):
                 response[r.display] = {'name': r.name, 'content_types': r.content_types}
             return response
 
+    @_ttl_cached(_STATIC_TTL)
     def all_platforms(self, get_list:bool=False) -> dict | list:
         """return all platforms from nautobot
 
@@ -453,23 +495,53 @@ class Getter(object):
         locations : dict | list
             list or dict of locations
         """        
-        locations = self._nautobot.dcim.locations.all()
+        rows = self._get_locations_gql()
+        if rows is None:
+            rows = self._get_locations_rest()
+        if location_type:
+            rows = [row for row in rows if row['location_type'] == location_type]
         if get_list:
-            return [loc.name for loc in locations if loc.location_type.name == location_type or not location_type]
-        else:
-            response = {}
-            for loc in locations:
-                if loc.location_type.name == location_type or not location_type:
-                    row = {'name': loc.name, 
-                                        'location_type': loc.location_type.name,
-                                        'description': loc.description,
-                          }
-                    if loc and loc.parent and loc.parent.name:
-                        row.update({'parent': loc.parent.name})
-                    else:
-                        row.update({'parent': None})
-                    response[loc.name] = row
-            return response
+            return [row['name'] for row in rows]
+        return {row['name']: row for row in rows}
+
+    def _get_locations_gql(self) -> list | None:
+        """return the rows of all locations using a single graphql query
+
+        None is returned if the query cannot be used (eg. the nb.general query
+        of the sot config has no locations block or nautobot returned an error).
+        """
+        query = self._sot.sot_config.get('queries', {}).get('nb.general')
+        if not query or 'locations' not in query:
+            logger.warning('query nb.general has no locations; using REST to get all locations')
+            return None
+        try:
+            data = self.query(select=['locations'], using='nb.general', where={}, mode='gql')
+        except KeyError:
+            # _execute_gql_query has already logged the errors of the response
+            logger.warning('graphql query of locations failed; using REST to get all locations')
+            return None
+        if not isinstance(data, dict) or data.get('locations') is None:
+            logger.warning('graphql response contains no locations; using REST to get all locations')
+            return None
+        rows = []
+        for loc in data['locations']:
+            parent = loc.get('parent') or {}
+            rows.append({'name': loc.get('name'),
+                         'location_type': (loc.get('location_type') or {}).get('name'),
+                         'description': loc.get('description'),
+                         'parent': parent.get('name') or None})
+        return rows
+
+    def _get_locations_rest(self) -> list:
+        """return the rows of all locations using the (paginated) REST API"""
+        rows = []
+        for loc in self._nautobot.dcim.locations.all():
+            parent = loc.parent.name if loc.parent and loc.parent.name else None
+            rows.append({'name': loc.name,
+                         'location_type': loc.location_type.name,
+                         'description': loc.description,
+                         'parent': parent})
+        return rows
 
     def query(
             self, 
@@ -520,6 +592,7 @@ class Getter(object):
         else:
             return queries._execute_gql_query(self, select=select, using=using, where=where)
 
+    @_ttl_cached(_STATIC_TTL)
     def get_ipam_choices(self) -> dict:
         """return IPAM choices
 
@@ -530,6 +603,7 @@ class Getter(object):
         """        
         return self._nautobot.ipam.ip_addresses.choices()
 
+    @_ttl_cached(_STATIC_TTL)
     def get_interface_type_choices(self) -> dict:
         """return interface type choices
 
@@ -1,6 +1,8 @@
 import yaml
 from importlib import resources
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # pynautobot
 from pynautobot import api
@@ -16,6 +18,18 @@ from veritas.sot import updater
 from veritas.sot import rest
 from veritas.sot import job
 
+# connection pool of the nautobot session; requests that fail with one of
+# the status codes are retried with backoff. Only the idempotent methods
+# (default of urllib3) are retried; POST and PATCH are never repeated
+# because nautobot may already have processed them (duplicate objects).
+# The last response is returned and not raised, so pynautobot still
+# raises its RequestError with the error message of nautobot.
+_POOL_CONNECTIONS = 20
+_POOL_MAXSIZE = 50
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.5
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
 
 class Sot:
     """
@@ -172,6 +186,30 @@ class Sot:
         """
         return dvc.Device(self, device)
 
+    def bulk_update(self, devices:list, properties:dict, max_workers:int=8) -> dict:
+        """update the same properties on many devices in parallel
+
+        Parameters
+        ----------
+        devices : list
+            names of the devices
+        properties : dict
+            properties to update
+        max_workers : int, optional
+            maximum number of parallel requests, by default 8
+
+        Returns
+        -------
+        dict
+            device name -> True if successful, False otherwise
+
+        Examples
+        --------
+        result = sot.bulk_update(['lab-01.local', 'lab-02.local'], {'serial': ''})
+
+        """
+        return dvc.bulk_update(self, devices, properties, max_workers=max_workers)
+
     def select(self, selected_values) -> selection:
         """returns initialized selection object to access nautobot
 
@@ -246,6 +284,14 @@ class Sot:
                                  api_version=api_version,
                                  verify=ssl_verify)
             self._nautobot.http_session.verify = ssl_verify
+            adapter = HTTPAdapter(pool_connections=_POOL_CONNECTIONS,
+                                  pool_maxsize=_POOL_MAXSIZE,
+                                  max_retries=Retry(total=_RETRY_TOTAL,
+                                                    backoff_factor=_RETRY_BACKOFF,
+                                                    status_forcelist=_RETRY_STATUS,
+                                                    raise_on_status=False))
+            self._nautobot.http_session.mount('https://', adapter)
+            self._nautobot.http_session.mount('http://', adapter)
 
         return self._nautobot
 
@@ -275,26 +275,37 @@ def read_excel_file(filename:str) -> list:
     table : list
         list of rows
     """
-    table = []
+    return list(iter_excel_file(filename))
 
-    # Load the workbook
-    workbook = load_workbook(filename = filename)
+def iter_excel_file(filename:str):
+    """read excel file row by row
 
-    # Select the active worksheet
-    worksheet = workbook.active
-    
-    # loop through table and build list of dict
-    rows = worksheet.max_row
-    columns = worksheet.max_column + 1 
-    for row in range(2, rows + 1):
-        line = {}
-        for col in range(1, columns):
-            key = worksheet.cell(row=1, column=col).value
-            value = worksheet.cell(row=row, column=col).value
-            line[key] = value
-        table.append(line)
-
-    return table
+    The workbook is opened read-only so that the sheet is streamed instead
+    of being loaded into memory at once.
+
+    Parameters
+    ----------
+    filename : str
+        filename of the excel file
+
+    Yields
+    ------
+    line : dict
+        the row; the keys are taken from the first row (header)
+    """
+    # Load the workbook
+    workbook = load_workbook(filename=filename, read_only=True)
+    try:
+        # Select the active worksheet
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # loop through table and build dict
+        for row in rows:
+            yield {key: row[col] if col < len(row) else None for col, key in enumerate(header)}
+    finally:
+        workbook.close()
 
 def set_value(mydict:dict, paths:list, value) -> None:
     """set value in a dict
@@ -318,7 +329,25 @@ def set_value(mydict:dict, paths:list, value) -> None:
     # at last write value to dict
     mydict[parts[-1]] = value
 
-def get_prefix_path(prefixe:list, ip:str) -> list:
+def get_prefix_tree(prefixe:list) -> pytricia.PyTricia:
+    """return pytricia tree of all prefixes
+
+    Parameters
+    ----------
+    prefixe : list
+        the list of ALL prefixes
+
+    Returns
+    -------
+    pytricia.PyTricia
+        the tree; pass it to get_prefix_path to avoid rebuilding it for each IP
+    """
+    pyt = pytricia.PyTricia()
+    for prefix_ip in prefixe:
+        pyt.insert(prefix_ip, prefix_ip)
+    return pyt
+
+def get_prefix_path(prefixe:list, ip:str, tree:pytricia.PyTricia=None) -> list:
     """return prefix path of ip
 
     Parameters
@@ -327,6 +356,8 @@ def get_prefix_path(prefixe:list, ip:str) -> list:
         the list of ALL prefixes
     ip : str
         the IP address
+    tree : pytricia.PyTricia, optional
+        prebuilt tree of the prefixes (see get_prefix_tree)
 
     Returns
     -------
@@ -334,11 +365,7 @@ def get_prefix_path(prefixe:list, ip:str) -> list:
         list of prefixes that include the IP address
     """
     prefix_path = []
-    pyt = pytricia.PyTricia()
-
-    # build pytricia tree
-    for prefix_ip in prefixe:
-        pyt.insert(prefix_ip, prefix_ip)
+    pyt = tree if tree is not None else get_prefix_tree(prefixe)
 
     try:
         prefix = pyt.get(ip)
@@ -0,0 +1,92 @@
+from dataclasses import asdict
+
+import pytest
+
+from veritas.sot import datamodel
+
+
+def _device(**properties):
+    values = {'name': 'lab.local',
+              'role': datamodel.RoleData(),
+              'device_type': 'c9300',
+              'location': datamodel.LocationData(name='lab', location_type='site')}
+    values.update(properties)
+    return datamodel.DeviceData(**values)
+
+
+def test_to_dict_equals_asdict_for_nested_dicts():
+    # onboarding sets platform and manufacturer to dicts although they are annotated as str
+    device = _device(platform={'name': 'ios', 'extra': None},
+                     manufacturer={'name': 'cisco'},
+                     interfaces=[datamodel.InterfaceData(name='Gi0/1', type='1000base-t',
+                                                         ip_addresses=[{'address': '192.0.2.1/24'}])])
+
+    assert device.to_dict() == asdict(device)
+
+
+def test_to_dict_does_not_share_objects_with_the_model():
+    device = _device(platform={'name': 'ios'}, custom_fields={'net': 'lab'})
+
+    props = device.to_dict()
+    props['platform']['name'] = 'nxos'
+    props['custom_fields']['net'] = 'prod'
+
+    assert device.platform == {'name': 'ios'}
+    assert device.custom_fields == {'net': 'lab'}
+
+
+def test_clean_removes_empty_values_of_nested_dicts():
+    device = _device(platform={'name': 'ios', 'extra': None},
+                     tenant={},
+                     custom_fields={'net': 'lab', 'owner': ''})
+
+    props = device.clean()
+
+    assert props['platform'] == {'name': 'ios'}
+    assert 'tenant' not in props
+    assert props['custom_fields'] == {'net': 'lab'}
+    assert props['platform'] is not device.platform
+
+
+class _Properties(dict):
+    # stands in for benedict, which is a dict subclass
+    pass
+
+
+def test_post_init_accepts_subclasses():
+    interface = datamodel.InterfaceData(name='Gi0/1', type='1000base-t',
+                                        ip_addresses=[_Properties(address='192.0.2.1/24',
+                                                                  status=_Properties(name='Active'))],
+                                        untagged_vlan=[_Properties(vid=10)])
+
+    ip_address = interface.ip_addresses[0]
+    assert type(ip_address) is datamodel.IPaddressData
+    assert ip_address.status == datamodel.StatusData(name='Active')
+    assert interface.untagged_vlan == [{'vid': 10}]
+
+
+def test_status_is_immutable():
+    status = datamodel.StatusData(name='Active')
+
+    with pytest.raises(TypeError, match='dataclasses.replace'):
+        status['name'] = 'Planned'
+
+    ip_address = datamodel.IPaddressData(address='192.0.2.1/24', status=status)
+    ip_address['status.name'] = 'Planned'
+    assert ip_address.status == datamodel.StatusData(name='Planned')
+    assert status.name == 'Active'
+
+
+def test_set_status_name_of_device():
+    device = _device(status=datamodel.StatusData(name='Active'))
+    device['status.name'] = 'Planned'
+    assert device.status == datamodel.StatusData(name='Planned')
+
+    # devices built from a payload keep the status as a dict
+    device = datamodel.DeviceData.from_payload({'name': 'lab.local',
+                                                'role': {'name': 'network'},
+                                                'device_type': 'c9300',
+                                                'location': {'name': 'lab'},
+                                                'status': {'name': 'Active'}})
+    device['status.name'] = 'Planned'
+    assert device.status == {'name': 'Planned'}
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from veritas.sot.getter import Getter
+
+_LOCATIONS_QUERY = 'query ($get_locations: Boolean!) { locations @include(if: $get_locations) { name } }'
+
+
+class _Response:
+    def __init__(self, json):
+        self.json = json
+
+
+def _getter(graphql_response, queries):
+    lab = SimpleNamespace(name='lab', description='', location_type=SimpleNamespace(name='site'), parent=None)
+    rack = SimpleNamespace(name='rack1', description='row 1', location_type=SimpleNamespace(name='rack'),
+                           parent=SimpleNamespace(name='lab'))
+    nautobot = SimpleNamespace(
+        graphql=SimpleNamespace(query=lambda query, variables: _Response(graphql_response)),
+        dcim=SimpleNamespace(locations=SimpleNamespace(all=lambda: [lab, rack])))
+    sot = SimpleNamespace(sot_config={'queries': queries}, open_nautobot=lambda: nautobot)
+    return Getter(sot)
+
+
+def test_all_locations_graphql():
+    response = {'data': {'locations': [
+        {'name': 'lab', 'description': '', 'location_type': {'name': 'site'}, 'parent': None},
+        {'name': 'rack1', 'description': 'row 1', 'location_type': {'name': 'rack'}, 'parent': {'name': 'lab'}}]}}
+    getter = _getter(response, {'nb.general': _LOCATIONS_QUERY})
+
+    assert getter.all_locations(location_type='rack') == {
+        'rack1': {'name': 'rack1', 'location_type': 'rack', 'description': 'row 1', 'parent': 'lab'}}
+    assert getter.all_locations(get_list=True) == ['lab', 'rack1']
+
+
+def test_all_locations_falls_back_to_rest():
+    expected = {'lab': {'name': 'lab', 'location_type': 'site', 'description': '', 'parent': None}}
+
+    # graphql returned an error
+    getter = _getter({'errors': [{'message': 'unknown field'}]}, {'nb.general': _LOCATIONS_QUERY})
+    assert getter.all_locations(location_type='site') == expected
+
+    # the nb.general query of the sot config has no locations block
+    getter = _getter({'data': {}}, {'nb.general': 'query { devices { name } }'})
+    assert getter.all_locations(location_type='site') == expected
@@ -0,0 +1,67 @@
+from benedict import benedict
+
+from veritas.onboarding.onboarding import Onboarding, _coerce_row
+
+
+def _device_defaults():
+    # get_device_properties copies the defaults from a benedict;
+    # the nested values are benedict instances and not plain dicts
+    defaults = benedict({'role': {'name': 'network'},
+                         'status': {'name': 'Active'},
+                         'platform': 'ios',
+                         'device_type': 'c9300',
+                         'tags': 'core,lab'})
+    return dict(defaults)
+
+
+def test_extend_device_properties_with_benedict_values():
+    properties = _device_defaults()
+
+    Onboarding._extend_device_properties(None, properties)
+
+    assert properties['role'] == {'name': 'network'}
+    assert properties['status'] == {'name': 'Active'}
+    assert properties['platform'] == {'name': 'ios'}
+    assert properties['device_type'] == {'model': 'c9300'}
+
+
+def test_extend_device_properties_batch_with_benedict_values():
+    list_of_properties = [_device_defaults(), _device_defaults()]
+
+    Onboarding.extend_device_properties_batch(None, list_of_properties)
+
+    for properties in list_of_properties:
+        assert properties['role'] == {'name': 'network'}
+        assert properties['platform'] == {'name': 'ios'}
+        assert properties['device_type'] == {'model': 'c9300'}
+        assert properties['tags'] == ['core', 'lab']
+
+
+def test_coerce_row_maps_columns_and_values():
+    column_mapping = {'hostname': 'name', 'state': 'status'}
+    value_mapping = {'status': {'up': 'Active', 'None': 'Planned'}}
+    value_mapping_none = {k: v.get('None') for k, v in value_mapping.items()}
+    row = {'hostname': 'lab.local', 'state': 'up', 'primary': 'TRUE', 'backup': 'false',
+           'monitoring': 'tRue', 'managed': 'FaLsE', 'comment': 'Truely'}
+
+    device = _coerce_row(row, {}, column_mapping, value_mapping, value_mapping_none)
+
+    assert device == {'name': 'lab.local', 'status': 'Active', 'primary': True, 'backup': False,
+                      'monitoring': True, 'managed': False, 'comment': 'Truely'}
+    assert _coerce_row({'state': None}, {}, column_mapping, value_mapping,
+                       value_mapping_none) == {'status': 'Planned'}
+    assert _coerce_row({'state': 'down'}, {}, column_mapping, value_mapping,
+                       value_mapping_none) == {'status': 'down'}
+
+
+def test_coerce_row_nests_keypaths():
+    column_mapping = {'net': 'custom_fields.net'}
+    row = {'name': 'lab.local', 'net': 'lab', 'custom_fields.owner': 'noc'}
+
+    device = _coerce_row(row, {}, column_mapping, {}, {}, keypaths=True)
+
+    assert device == {'name': 'lab.local', 'custom_fields': {'net': 'lab', 'owner': 'noc'}}
+    # rows of yaml inventories are not nested
+    assert _coerce_row(row, {}, column_mapping, {}, {}) == {'name': 'lab.local',
+                                                            'custom_fields.net': 'lab',
+                                                            'custom_fields.owner': 'noc'}
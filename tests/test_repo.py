@@ -0,0 +1,26 @@
+from git import Actor, Repo
+
+from veritas.repo import Repository
+
+
+def _commit(git_repo, path, filename, content, message):
+    (path / filename).write_text(content)
+    git_repo.index.add([filename])
+    return git_repo.index.commit(message, author=Actor('lab', 'lab@example.com'))
+
+
+def test_get_info_after_head_was_moved(tmp_path):
+    git_repo = Repo.init(tmp_path)
+    first = _commit(git_repo, tmp_path, 'config', 'hostname lab\n', 'first')
+    repo = Repository(path=str(tmp_path), repo='lab')
+    assert repo.get_info()['last_commit_id'] == first.hexsha
+
+    # git itself (not the Repository object) moves HEAD
+    second = _commit(git_repo, tmp_path, 'config', 'hostname lab2\n', 'second')
+    assert repo.get_info()['last_commit_id'] == second.hexsha
+    assert repo.get_info()['last_commit_message'] == 'second'
+
+    git_repo.git.checkout('-b', 'feature', first.hexsha)
+    info = repo.get_info()
+    assert info['current_branch'] == 'feature'
+    assert info['last_commit_id'] == first.hexsha
@@ -0,0 +1,52 @@
+import os
+
+from veritas.onboarding import tags
+
+
+def test_parse_config_backreference_rule():
+    # the first rule has a group; combining the rules would renumber the
+    # group of the second rule and its backreference \1 would never match
+    config = {'tags': [
+        {'name': 'has_description', 'pattern': r'^ description (\w+)'},
+        {'name': 'repeated_word', 'pattern': r'^ (\w+) \1$'},
+    ]}
+    device_config = ['interface GigabitEthernet0/1',
+                     ' description uplink',
+                     ' shutdown shutdown']
+
+    result = tags.parse_config(device_config, 'lab.local', config)
+
+    assert result == [{'name': 'has_description', 'scope': 'dcim.device'},
+                      {'name': 'repeated_word', 'scope': 'dcim.device'}]
+
+
+def test_parse_config_interface_scope():
+    config = {'tags': [
+        {'name': 'uplink', 'pattern': r'^ description uplink', 'scope': 'dcim.interface'},
+        {'name': 'ospf', 'contains': 'router ospf'},
+        {'name': 'bgp', 'contains': 'router bgp'},
+    ]}
+    device_config = ['interface GigabitEthernet0/1',
+                     ' description uplink',
+                     'router ospf 1']
+
+    result = tags.parse_config(device_config, 'lab.local', config)
+
+    assert result == [{'name': 'uplink', 'interface': 'GigabitEthernet0/1', 'scope': 'dcim.interface'},
+                      {'name': 'ospf', 'scope': 'dcim.device'}]
+
+
+def test_read_file_replaces_modified_config(tmp_path):
+    filename = str(tmp_path / 'tags.yaml')
+    with open(filename, 'w') as f:
+        f.write('name: lab\nactive: true\ntags: []\n')
+    assert tags.read_file(filename, {})['name'] == 'lab'
+
+    with open(filename, 'w') as f:
+        f.write('name: prod\nactive: true\ntags: []\n')
+    # make sure that the mtime differs even on coarse file systems
+    mtime = os.path.getmtime(filename) + 10
+    os.utime(filename, (mtime, mtime))
+
+    assert tags.read_file(filename, {})['name'] == 'prod'
+    assert tags._YAML_CACHE[filename][1]['name'] == 'prod'